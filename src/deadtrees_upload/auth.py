@@ -1,15 +1,17 @@
 """Authentication module for Supabase login."""
 
-from typing import Optional, Tuple
-from dataclasses import dataclass
+from typing import Dict, Optional, Tuple
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import dataclass, field
+from functools import lru_cache
+import atexit
+import base64
+import threading
 import time
 import json
 import os
 from pathlib import Path
 import httpx
-from rich.console import Console
-
-console = Console()
 
 
 class AuthError(Exception):
@@ -17,6 +19,65 @@ class AuthError(Exception):
 	pass
 
 
+# Shared HTTP clients keyed by (base URL, api key), so repeated auth calls reuse
+# pooled connections without mixing up apikey headers
+_shared_clients: Dict[Tuple[str, Optional[str]], httpx.Client] = {}
+_shared_clients_lock = threading.Lock()
+
+
+def get_shared_client(base_url: str, api_key: Optional[str] = None) -> httpx.Client:
+	"""
+	Get a pooled HTTP client for a base URL and API key, creating it on first use.
+	
+	Args:
+		base_url: Base URL the client talks to (Supabase or API URL)
+		api_key: Optional Supabase anon key sent as the `apikey` header
+	
+	Returns:
+		Shared httpx.Client with keep-alive connection pooling
+	"""
+	with _shared_clients_lock:
+		client = _shared_clients.get((base_url, api_key))
+		if client is None:
+			headers = {"Content-Type": "application/json"}
+			if api_key:
+				headers["apikey"] = api_key
+			client = httpx.Client(
+				base_url=base_url,
+				timeout=30.0,
+				limits=httpx.Limits(max_keepalive_connections=8, keepalive_expiry=300),
+				headers=headers,
+			)
+			_shared_clients[(base_url, api_key)] = client
+		return client
+
+
+@atexit.register
+def _close_shared_clients() -> None:
+	"""Close all pooled HTTP clients on interpreter exit."""
+	with _shared_clients_lock:
+		for client in _shared_clients.values():
+			client.close()
+		_shared_clients.clear()
+
+
+# Start refreshing in the background this many seconds before the token expires
+PROACTIVE_REFRESH_SECONDS = 600
+
+# Only block callers on a refresh once the token is this close to expiry
+HARD_EXPIRY_SECONDS = 60
+
+# After a failed background refresh, wait this long before trying again
+# (unless the token reaches HARD_EXPIRY_SECONDS first)
+REFRESH_RETRY_SECONDS = 60
+
+# Cached sessions this long past expiry are dropped unread; the refresh token is assumed dead
+STALE_SESSION_SECONDS = 30 * 24 * 3600
+
+# Single worker: at most one refresh is in flight per process
+_refresh_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="token-refresh")
+
+
 @dataclass
 class AuthSession:
 	"""Authentication session with token refresh support."""
@@ -27,36 +88,45 @@ class AuthSession:
 	supabase_url: str
 	supabase_key: str
 	
+	# Serializes refreshes so concurrent callers don't burn the single-use refresh token
+	_refresh_lock: threading.Lock = field(default_factory=threading.Lock, init=False, repr=False, compare=False)
+	
+	# Pending background refresh, if one has been scheduled
+	_refresh_future: Optional[Future] = field(default=None, init=False, repr=False, compare=False)
+	_future_lock: threading.Lock = field(default_factory=threading.Lock, init=False, repr=False, compare=False)
+	
+	# (error, time.monotonic()) of the last failed background refresh
+	_refresh_failure: Optional[Tuple[Exception, float]] = field(default=None, init=False, repr=False, compare=False)
+	
+	# (token, "Bearer <token>") for the token the header was last built from
+	_auth_header: Optional[Tuple[str, str]] = field(default=None, init=False, repr=False, compare=False)
+	
 	def is_expired(self, buffer_seconds: int = 300) -> bool:
 		"""Check if token is expired or will expire soon."""
 		return time.time() >= (self.expires_at - buffer_seconds)
 	
 	def refresh(self) -> None:
 		"""Refresh the access token using refresh token."""
-		refresh_url = f"{self.supabase_url.rstrip('/')}/auth/v1/token?grant_type=refresh_token"
+		client = get_shared_client(self.supabase_url, self.supabase_key)
 		
 		try:
-			with httpx.Client(timeout=30.0) as client:
-				response = client.post(
-					refresh_url,
-					json={"refresh_token": self.refresh_token},
-					headers={
-						"apikey": self.supabase_key,
-						"Content-Type": "application/json",
-					},
-				)
-				
-				if response.status_code >= 400:
-					raise AuthError("Failed to refresh token - please re-authenticate")
-				
-				data = response.json()
-				self.access_token = data.get("access_token", self.access_token)
-				self.refresh_token = data.get("refresh_token", self.refresh_token)
-				
-				# Supabase tokens typically expire in 3600 seconds (1 hour)
-				expires_in = data.get("expires_in", 3600)
-				self.expires_at = time.time() + expires_in
-				
+			response = client.post(
+				"/auth/v1/token",
+				params={"grant_type": "refresh_token"},
+				json={"refresh_token": self.refresh_token},
+			)
+			
+			if response.status_code >= 400:
+				raise AuthError("Failed to refresh token - please re-authenticate")
+			
+			data = response.json()
+			self.access_token = data.get("access_token", self.access_token)
+			self.refresh_token = data.get("refresh_token", self.refresh_token)
+			
+			# Supabase tokens typically expire in 3600 seconds (1 hour)
+			expires_in = data.get("expires_in", 3600)
+			self.expires_at = time.time() + expires_in
+			
 		except httpx.ConnectError:
 			raise AuthError(f"Could not connect to Supabase for token refresh")
 		except Exception as e:
@@ -64,35 +134,113 @@ class AuthSession:
 				raise
 			raise AuthError(f"Token refresh failed: {str(e)}")
 	
+	def refresh_if_unchanged(self, auth_header: str) -> None:
+		"""
+		Refresh the token if auth_header still carries the current one.
+		
+		Concurrent requests that all get a 401 for the same token then trigger a
+		single refresh instead of racing to reuse the refresh token.
+		"""
+		with self._refresh_lock:
+			if auth_header == f"Bearer {self.access_token}":
+				self.refresh()
+	
+	def _refresh_in_background(self) -> None:
+		"""Refresh under the session lock, then clear the pending future."""
+		try:
+			with self._refresh_lock:
+				# Another thread may have refreshed while we waited for the lock
+				if self.is_expired(buffer_seconds=PROACTIVE_REFRESH_SECONDS):
+					self.refresh()
+			self._refresh_failure = None
+		except Exception as e:
+			self._refresh_failure = (e, time.monotonic())
+			raise
+		finally:
+			with self._future_lock:
+				self._refresh_future = None
+	
+	def _schedule_refresh(self) -> Future:
+		"""Start a background refresh unless one is already pending."""
+		with self._future_lock:
+			if self._refresh_future is None:
+				self._refresh_future = _refresh_executor.submit(self._refresh_in_background)
+			return self._refresh_future
+	
 	def get_valid_token(self) -> str:
-		"""Get a valid access token, refreshing if necessary."""
-		if self.is_expired():
-			self.refresh()
+		"""
+		Get a valid access token, refreshing if necessary.
+		
+		Shortly before expiry a refresh is started in the background while the
+		current token keeps being served; callers only wait for the refresh once
+		the token is about to expire. A failed background refresh is retried
+		after REFRESH_RETRY_SECONDS, and its error is raised once the token is
+		about to expire and the retry fails as well.
+		
+		Raises:
+			AuthError: If the token is about to expire and cannot be refreshed
+		"""
+		if not self.is_expired(buffer_seconds=PROACTIVE_REFRESH_SECONDS):
+			return self.access_token
+		
+		if self.is_expired(buffer_seconds=HARD_EXPIRY_SECONDS):
+			self._schedule_refresh().result()  # Re-raises AuthError if the refresh failed
+			return self.access_token
+		
+		failure = self._refresh_failure
+		if failure is None or time.monotonic() - failure[1] >= REFRESH_RETRY_SECONDS:
+			self._schedule_refresh()
 		return self.access_token
+	
+	def get_auth_header(self) -> str:
+		"""
+		Get the Authorization header value for a valid access token.
+		
+		The header string is rebuilt only when the token changes.
+		"""
+		token = self.get_valid_token()
+		cached = self._auth_header
+		if cached is None or cached[0] is not token:
+			cached = (token, f"Bearer {token}")
+			self._auth_header = cached
+		return cached[1]
 
 
 def _get_cache_dir() -> Path:
 	"""Get cache directory for storing auth sessions."""
-	override = os.getenv("DEADTREES_UPLOAD_CACHE_DIR")
+	return _resolve_cache_dir(os.getenv("DEADTREES_UPLOAD_CACHE_DIR"), os.getenv("XDG_CACHE_HOME"))
+
+
+@lru_cache(maxsize=4)
+def _resolve_cache_dir(override: Optional[str], xdg_cache: Optional[str]) -> Path:
+	"""Resolve the cache directory; cached per environment so lookups stay cheap."""
 	if override:
 		return Path(override).expanduser().resolve()
 	
-	xdg_cache = os.getenv("XDG_CACHE_HOME")
 	if xdg_cache:
 		return Path(xdg_cache).expanduser().resolve() / "deadtrees_upload"
 	
 	return Path.home() / ".cache" / "deadtrees_upload"
 
 
+# Maps every non-alphanumeric Latin-1 character to "_"
+_SANITIZE_TABLE = str.maketrans({c: "_" for c in map(chr, range(256)) if not c.isalnum()})
+
+
 def _sanitize_api_url(api_url: str) -> str:
 	"""Convert API URL into a safe filename fragment."""
-	return "".join(char if char.isalnum() else "_" for char in api_url.lower())
+	return api_url.lower().translate(_SANITIZE_TABLE)
+
+
+@lru_cache(maxsize=16)
+def _auth_session_path(cache_dir: Path, api_url: str) -> Path:
+	"""Build the session file path; keyed on the cache dir so env changes still apply."""
+	return cache_dir / f"auth_session_{_sanitize_api_url(api_url)}.json"
 
 
 def get_auth_session_path(api_url: str) -> Path:
 	"""Get path for cached auth session file."""
-	cache_dir = _get_cache_dir()
-	return cache_dir / f"auth_session_{_sanitize_api_url(api_url)}.json"
+	return _auth_session_path(_get_cache_dir(), api_url)
 
 
 def save_auth_session(session: AuthSession, api_url: str) -> None:
@@ -109,11 +257,19 @@ def save_auth_session(session: AuthSession, api_url: str) -> None:
 		"supabase_key": session.supabase_key,
 	}
 	
-	path.write_text(json.dumps(payload))
+	# Tokens are written to a temp file that is owner-only from creation and
+	# then swapped in, so the session is never readable by others or half-written
+	tmp = path.with_suffix(path.suffix + ".tmp")
+	fd = os.open(tmp, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
 	try:
-		os.chmod(path, 0o600)
+		# A stale temp file from an older run keeps its mode; tighten it first
+		os.chmod(tmp, 0o600)
 	except OSError:
 		pass
+	with os.fdopen(fd, "w") as f:
+		# Header line lets load_auth_session drop long-dead sessions without parsing JSON
+		f.write(f"{session.expires_at}\n{json.dumps(payload, separators=(',', ':'))}")
+	os.replace(tmp, path)
 
 
 def load_auth_session(api_url: str) -> Optional[AuthSession]:
@@ -123,7 +279,14 @@ def load_auth_session(api_url: str) -> Optional[AuthSession]:
 		return None
 	
 	try:
-		payload = json.loads(path.read_text())
+		with open(path) as f:
+			line = f.readline()
+			# Files written before the expires_at header are a single JSON line
+			if not line.startswith("{"):
+				if time.time() > float(line) + STALE_SESSION_SECONDS:
+					return None
+				line = f.readline()
+		payload = json.loads(line)
 		return AuthSession(
 			access_token=payload["access_token"],
 			refresh_token=payload.get("refresh_token", ""),
@@ -178,28 +341,28 @@ def login(email: str, password: str, api_url: str) -> Tuple[str, str]:
 	# For now, we'll use the API's auth endpoint
 	
 	auth_url = api_url.rstrip("/") + "/auth/login"
+	client = get_shared_client(api_url)
 	
 	try:
-		with httpx.Client(timeout=30.0) as client:
-			response = client.post(
-				auth_url,
-				json={"email": email, "password": password},
-			)
-			
-			if response.status_code == 401:
-				raise AuthError("Invalid email or password")
-			
-			response.raise_for_status()
-			data = response.json()
-			
-			access_token = data.get("access_token")
-			user_id = data.get("user", {}).get("id")
-			
-			if not access_token:
-				raise AuthError("No access token in response")
-			
-			return access_token, user_id
-			
+		response = client.post(
+			"auth/login",
+			json={"email": email, "password": password},
+		)
+		
+		if response.status_code == 401:
+			raise AuthError("Invalid email or password")
+		
+		response.raise_for_status()
+		data = response.json()
+		
+		access_token = data.get("access_token")
+		user_id = data.get("user", {}).get("id")
+		
+		if not access_token:
+			raise AuthError("No access token in response")
+		
+		return access_token, user_id
+		
 	except httpx.ConnectError:
 		raise AuthError(f"Could not connect to {auth_url}")
 	except httpx.HTTPStatusError as e:
@@ -244,44 +407,40 @@ def create_auth_session(email: str, password: str, supabase_url: str, supabase_k
 	Raises:
 		AuthError: If authentication fails
 	"""
-	auth_url = f"{supabase_url.rstrip('/')}/auth/v1/token?grant_type=password"
+	client = get_shared_client(supabase_url, supabase_key)
 	
 	try:
-		with httpx.Client(timeout=30.0) as client:
-			response = client.post(
-				auth_url,
-				json={"email": email, "password": password},
-				headers={
-					"apikey": supabase_key,
-					"Content-Type": "application/json",
-				},
-			)
-			
-			if response.status_code == 400:
-				error_data = response.json()
-				error_msg = error_data.get("error_description", error_data.get("msg", "Invalid credentials"))
-				raise AuthError(error_msg)
-			
-			response.raise_for_status()
-			data = response.json()
-			
-			access_token = data.get("access_token")
-			refresh_token = data.get("refresh_token", "")
-			user_id = data.get("user", {}).get("id")
-			expires_in = data.get("expires_in", 3600)  # Default 1 hour
-			
-			if not access_token:
-				raise AuthError("No access token in response")
-			
-			return AuthSession(
-				access_token=access_token,
-				refresh_token=refresh_token,
-				user_id=user_id,
-				expires_at=time.time() + expires_in,
-				supabase_url=supabase_url,
-				supabase_key=supabase_key,
-			)
-			
+		response = client.post(
+			"/auth/v1/token",
+			params={"grant_type": "password"},
+			json={"email": email, "password": password},
+		)
+		
+		if response.status_code == 400:
+			error_data = response.json()
+			error_msg = error_data.get("error_description", error_data.get("msg", "Invalid credentials"))
+			raise AuthError(error_msg)
+		
+		response.raise_for_status()
+		data = response.json()
+		
+		access_token = data.get("access_token")
+		refresh_token = data.get("refresh_token", "")
+		user_id = data.get("user", {}).get("id")
+		expires_in = data.get("expires_in", 3600)  # Default 1 hour
+		
+		if not access_token:
+			raise AuthError("No access token in response")
+		
+		return AuthSession(
+			access_token=access_token,
+			refresh_token=refresh_token,
+			user_id=user_id,
+			expires_at=time.time() + expires_in,
+			supabase_url=supabase_url,
+			supabase_key=supabase_key,
+		)
+		
 	except httpx.ConnectError:
 		raise AuthError(f"Could not connect to Supabase at {supabase_url}")
 	except httpx.HTTPStatusError as e:
@@ -292,25 +451,65 @@ def create_auth_session(email: str, password: str, supabase_url: str, supabase_k
 		raise AuthError(f"Authentication error: {str(e)}")
 
 
-def verify_token(token: str, api_url: str) -> bool:
+def decode_token_claims(token: str) -> Optional[dict]:
+	"""
+	Decode the payload of a JWT access token without verifying its signature.
+	
+	Args:
+		token: JWT access token
+	
+	Returns:
+		Dict of claims, or None if the token is not a decodable JWT
+	"""
+	try:
+		payload_b64 = token.split(".")[1]
+		payload_b64 += "=" * (-len(payload_b64) % 4)
+		claims = json.loads(base64.urlsafe_b64decode(payload_b64))
+	except Exception:
+		return None
+	return claims if isinstance(claims, dict) else None
+
+
+def session_matches_email(session: AuthSession, email: str) -> bool:
+	"""Check whether a session's access token was issued for the given email."""
+	claims = decode_token_claims(session.access_token) or {}
+	token_email = claims.get("email")
+	return isinstance(token_email, str) and token_email.lower() == email.strip().lower()
+
+
+def verify_token(token: str, api_url: str, remote: bool = False) -> bool:
 	"""
 	Verify that a token is still valid.
 	
+	By default this only checks the `exp` claim locally, which is enough to
+	decide whether a token is worth sending. Use `remote=True` to ask the API,
+	e.g. to detect server-side revocation.
+	
 	Args:
 		token: Access token to verify
 		api_url: Base API URL
+		remote: Verify against the API instead of decoding locally
 	
 	Returns:
 		True if token is valid
 	"""
-	verify_url = api_url.rstrip("/") + "/auth/verify"
+	if not remote:
+		claims = decode_token_claims(token)
+		if claims is None:
+			return False
+		try:
+			return float(claims.get("exp", 0)) > time.time()
+		except (TypeError, ValueError):
+			return False
+	
+	client = get_shared_client(api_url)
 	
 	try:
-		with httpx.Client(timeout=10.0) as client:
-			response = client.get(
-				verify_url,
-				headers={"Authorization": f"Bearer {token}"},
-			)
-			return response.status_code == 200
+		response = client.get(
+			"auth/verify",
+			headers={"Authorization": f"Bearer {token}"},
+			timeout=10.0,
+		)
+		return response.status_code == 200
 	except Exception:
 		return False
@@ -1,27 +1,12 @@
 """Main CLI entry point using Typer."""
 
+from collections import Counter
 from pathlib import Path
 from typing import Optional
 
 import typer
-from rich.console import Console
-from rich.prompt import Prompt
 
 from . import __version__
-from .auth import create_auth_session, AuthError, save_auth_session
-from .metadata import read_metadata_file, find_column_mapping, MetadataError
-from .validation import find_uploadable_files, ValidationError
-from .dedup import get_session_file_path
-from .display import print_header, print_step, show_summary
-from .prompts import (
-	get_supabase_config,
-	authenticate,
-	select_data_directory,
-	select_metadata_file,
-	map_columns,
-	check_existing_session,
-)
-from .workflow import validate_and_match, do_upload
 
 
 # Create Typer app
@@ -32,8 +17,6 @@ app = typer.Typer(
 	invoke_without_command=True,
 )
 
-console = Console()
-
 # Default values
 DEFAULT_API_URL = "https://data2.deadtrees.earth/api/v1/"
 
@@ -82,6 +65,27 @@ def main(
 	if ctx.invoked_subcommand is not None:
 		return
 	
+	# Deferred so `--help` and `version` don't pay for pandas, rasterio and httpx
+	from rich.console import Console
+	from rich.prompt import Prompt
+	
+	from .auth import create_auth_session, AuthError, save_auth_session, get_cached_session, session_matches_email
+	from .metadata import read_metadata_file, find_column_mapping, MetadataError
+	from .validation import find_uploadable_files, ValidationError
+	from .dedup import get_session_file_path
+	from .display import print_header, print_step, show_summary
+	from .prompts import (
+		get_supabase_config,
+		authenticate,
+		select_data_directory,
+		select_metadata_file,
+		map_columns,
+		check_existing_session,
+	)
+	from .workflow import validate_and_match, do_upload
+	
+	console = Console()
+	
 	print_header()
 	
 	# Step 1: Authentication
@@ -91,24 +95,31 @@ def main(
 		print_step(1, "Authentication")
 		if "localhost" in api_url:
 			console.print("[dim]Using local Supabase for authentication[/dim]")
-		password = Prompt.ask("[bold]Password[/bold]", password=True)
-		with console.status("[bold green]Authenticating...[/bold green]"):
-			try:
-				auth_session = create_auth_session(
-					email=email,
-					password=password,
-					supabase_url=supabase_url,
-					supabase_key=supabase_key,
-				)
-				console.print(f"[green]✓[/green] Authenticated as [bold]{email}[/bold]")
-				console.print("[dim]Token will auto-refresh during long uploads[/dim]")
+		
+		# Reuse stored credentials for the same user instead of a password round-trip
+		cached_session = get_cached_session(api_url)
+		if cached_session and cached_session.user_id and session_matches_email(cached_session, email):
+			auth_session = cached_session
+			console.print(f"[green]✓[/green] Using stored credentials for [bold]{email}[/bold]")
+		else:
+			password = Prompt.ask("[bold]Password[/bold]", password=True)
+			with console.status("[bold green]Authenticating...[/bold green]"):
 				try:
-					save_auth_session(auth_session, api_url)
-				except Exception:
-					console.print("[yellow]![/yellow] Could not persist credentials")
-			except AuthError as e:
-				console.print(f"[red]✗[/red] Authentication failed: {e}")
-				raise typer.Exit(1)
+					auth_session = create_auth_session(
+						email=email,
+						password=password,
+						supabase_url=supabase_url,
+						supabase_key=supabase_key,
+					)
+					console.print(f"[green]✓[/green] Authenticated as [bold]{email}[/bold]")
+					console.print("[dim]Token will auto-refresh during long uploads[/dim]")
+					try:
+						save_auth_session(auth_session, api_url)
+					except Exception:
+						console.print("[yellow]![/yellow] Could not persist credentials")
+				except AuthError as e:
+					console.print(f"[red]✗[/red] Authentication failed: {e}")
+					raise typer.Exit(1)
 	else:
 		auth_session = authenticate(api_url)
 	
@@ -120,8 +131,9 @@ def main(
 		print_step(2, "Select Data Directory")
 		try:
 			files, file_types = find_uploadable_files(data_dir)
-			geotiff_count = sum(1 for t in file_types.values() if t == "GeoTIFF")
-			zip_count = sum(1 for t in file_types.values() if t == "ZIP")
+			type_counts = Counter(file_types.values())
+			geotiff_count = type_counts["GeoTIFF"]
+			zip_count = type_counts["ZIP"]
 			console.print(f"[green]✓[/green] Found [bold]{len(files)}[/bold] files")
 			if geotiff_count:
 				console.print(f"  • {geotiff_count} GeoTIFF files")
@@ -210,7 +222,7 @@ def main(
 @app.command()
 def version():
 	"""Show version information."""
-	console.print(f"deadtrees-upload version {__version__}")
+	typer.echo(f"deadtrees-upload version {__version__}")
 
 
 if __name__ == "__main__":
@@ -2,19 +2,31 @@
 
 import json
 import hashlib
+import mmap
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from pathlib import Path
-from typing import Optional, Dict, List, Set
-from dataclasses import dataclass, field, asdict
+from typing import Any, Callable, Optional, Dict, List, Set
+from dataclasses import dataclass, field
 from datetime import datetime
 
-import httpx
-
 
 class DedupError(Exception):
 	"""Duplicate detection error."""
 	pass
 
 
+# Digest used for file identifiers. It must match the backend's
+# shared/hash.py, or duplicates can no longer be detected server-side
+HASH_ALGORITHM = "sha256"
+
+# Maximum number of files hashed concurrently. hashlib releases the GIL
+# while digesting, so hashing scales with cores; more threads than about
+# twice the core count only add contention once the samples are cached
+HASH_WORKERS = min(16, (os.cpu_count() or 1) * 2)
+
+
 def get_file_identifier(file_path: Path, sample_size: int = 10 * 1024 * 1024) -> str:
 	"""
 	Generate a quick file identifier by sampling start/end of file.
@@ -26,47 +38,101 @@ def get_file_identifier(file_path: Path, sample_size: int = 10 * 1024 * 1024) ->
 		sample_size: Size of samples to read (default 10MB)
 	
 	Returns:
-		SHA256 hex digest
+		Hex digest (HASH_ALGORITHM)
 	"""
 	file_size = file_path.stat().st_size
-	hasher = hashlib.sha256()
+	hasher = hashlib.new(HASH_ALGORITHM)
 	
+	# Hash file size
+	hasher.update(str(file_size).encode())
+	
+	if file_size == 0:
+		return hasher.hexdigest()  # mmap cannot map empty files
+	
+	# Hash straight from the page cache instead of copying samples into new buffers
 	with open(file_path, 'rb') as f:
-		# Hash file size
-		hasher.update(str(file_size).encode())
-		
-		# Hash first 10MB
-		hasher.update(f.read(sample_size))
+		with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm, memoryview(mm) as view:
+			# Hash first 10MB
+			hasher.update(view[:sample_size])
+			
+			# Hash last 10MB
+			if file_size > sample_size:
+				hasher.update(view[file_size - sample_size:])
 		
-		# Hash last 10MB
-		if file_size > sample_size:
-			f.seek(-min(sample_size, file_size), 2)
-			hasher.update(f.read(sample_size))
+		# Sampled pages are not needed again soon; don't let a large batch
+		# push more useful data out of the page cache. Only once the mapping
+		# is gone: the kernel does not drop pages that are still mapped
+		if hasattr(os, "posix_fadvise"):
+			try:
+				os.posix_fadvise(f.fileno(), 0, 0, os.POSIX_FADV_DONTNEED)
+			except OSError:
+				pass
 	
 	return hasher.hexdigest()
 
 
-def check_hash_exists(file_hash: str, api_url: str, token: str) -> Optional[int]:
+# Bytes read from the start of a file for its quick identifier
+QUICK_SAMPLE_SIZE = 64 * 1024
+
+
+def get_quick_identifier(file_path: Path, sample_size: int = QUICK_SAMPLE_SIZE) -> str:
 	"""
-	Check if a file hash already exists in the database.
+	Fingerprint a file from its size and first bytes.
+	
+	Identical files always share a quick identifier, so files whose quick
+	identifier is unique within a batch cannot be duplicates of each other
+	and never need the full get_file_identifier hash. Only meant for local
+	comparisons; the backend knows nothing about it.
 	
 	Args:
-		file_hash: SHA256 hash to check
-		api_url: Base API URL
-		token: Authentication token
+		file_path: Path to file
+		sample_size: Number of leading bytes to hash (default 64KiB)
 	
 	Returns:
-		Dataset ID if exists, None otherwise
+		Hex digest
 	"""
-	# Query the API to check for existing hash
-	# This would require an endpoint on the backend
-	# For now, we'll implement a fallback using filename matching
+	with open(file_path, 'rb') as f:
+		hasher = hashlib.blake2b(str(os.fstat(f.fileno()).st_size).encode())
+		hasher.update(f.read(sample_size))
+	return hasher.hexdigest()
+
+
+def find_possible_duplicates(files: List[Path]) -> Set[Path]:
+	"""
+	Find the files that share a quick identifier with another file.
 	
-	# TODO: Implement API endpoint for hash check
-	# check_url = api_url.rstrip("/") + "/datasets/check-hash"
-	# response = client.post(check_url, json={"sha256": file_hash}, headers=...)
+	Files that cannot be read are included, so the full hash reports the error.
 	
-	return None
+	Args:
+		files: List of file paths
+	
+	Returns:
+		Set of paths that may have a duplicate among files
+	"""
+	def quick_identifier(file_path: Path) -> Optional[str]:
+		try:
+			return get_quick_identifier(file_path)
+		except OSError:
+			return None
+	
+	with ThreadPoolExecutor(max_workers=max(1, min(HASH_WORKERS, len(files)))) as executor:
+		quick_ids = list(executor.map(quick_identifier, files))
+	
+	first_seen: Dict[str, Path] = {}
+	candidates = set()
+	for file_path, quick_id in zip(files, quick_ids):
+		if quick_id is None:
+			candidates.add(file_path)
+		elif quick_id in first_seen:
+			candidates.add(file_path)
+			candidates.add(first_seen[quick_id])
+		else:
+			first_seen[quick_id] = file_path
+	return candidates
+
+
+# Minimum seconds between periodic session saves during upload
+SESSION_SAVE_INTERVAL = 5.0
 
 
 @dataclass
@@ -80,16 +146,20 @@ class UploadSessionState:
 	
 	# File tracking
 	files_total: int = 0
-	files_completed: List[str] = field(default_factory=list)
+	files_completed: Set[str] = field(default_factory=set)
 	files_failed: Dict[str, str] = field(default_factory=dict)  # filename -> error
 	files_skipped: Dict[str, str] = field(default_factory=dict)  # filename -> reason
 	
 	# Hash cache for duplicate detection
-	file_hashes: Dict[str, str] = field(default_factory=dict)  # filename -> hash
+	file_hashes: Dict[str, str] = field(default_factory=dict)  # get_hash_cache_key (path:size:mtime_ns) -> hash
+	hash_algorithm: str = HASH_ALGORITHM
 	
 	# Results
 	dataset_ids: Dict[str, int] = field(default_factory=dict)  # filename -> dataset_id
 	
+	# Monotonic time of the last save (not persisted)
+	_last_save: float = field(default=0.0, init=False, repr=False, compare=False)
+	
 	@property
 	def files_pending(self) -> int:
 		"""Count of files not yet processed."""
@@ -103,7 +173,7 @@ class UploadSessionState:
 	
 	def mark_completed(self, filename: str, dataset_id: int) -> None:
 		"""Mark a file as successfully uploaded."""
-		self.files_completed.append(filename)
+		self.files_completed.add(filename)
 		self.dataset_ids[filename] = dataset_id
 		# Remove from failed if it was retried
 		self.files_failed.pop(filename, None)
@@ -120,16 +190,55 @@ class UploadSessionState:
 		"""Check if a file should be processed (not already completed or skipped)."""
 		return filename not in self.files_completed and filename not in self.files_skipped
 	
+	def _to_dict(self) -> Dict[str, Any]:
+		"""Serializable view of the state; unlike asdict() it doesn't deep-copy the containers."""
+		return {
+			"session_id": self.session_id,
+			"created_at": self.created_at,
+			"data_directory": self.data_directory,
+			"metadata_file": self.metadata_file,
+			"api_url": self.api_url,
+			"files_total": self.files_total,
+			"files_completed": sorted(self.files_completed),
+			"files_failed": self.files_failed,
+			"files_skipped": self.files_skipped,
+			"file_hashes": self.file_hashes,
+			"hash_algorithm": self.hash_algorithm,
+			"dataset_ids": self.dataset_ids,
+		}
+	
 	def save(self, path: Path) -> None:
-		"""Save session state to file."""
-		with open(path, 'w') as f:
-			json.dump(asdict(self), f, indent=2)
+		"""Save session state to file atomically."""
+		tmp = path.with_suffix(path.suffix + ".tmp")
+		with open(tmp, 'w') as f:
+			json.dump(self._to_dict(), f, separators=(',', ':'))
+		os.replace(tmp, path)
+		self._last_save = time.monotonic()
+	
+	def save_if_due(self, path: Path, interval: float = SESSION_SAVE_INTERVAL) -> bool:
+		"""
+		Save session state if more than `interval` seconds passed since the last save.
+		
+		Returns:
+			True if the state was written
+		"""
+		if time.monotonic() - self._last_save < interval:
+			return False
+		self.save(path)
+		return True
 	
 	@classmethod
 	def load(cls, path: Path) -> 'UploadSessionState':
 		"""Load session state from file."""
 		with open(path, 'r') as f:
 			data = json.load(f)
+		data['files_completed'] = set(data.get('files_completed', []))
+		
+		# Cached hashes from another algorithm can't be compared; sessions
+		# written before the field existed used sha256
+		if data.get('hash_algorithm', 'sha256') != HASH_ALGORITHM:
+			data['file_hashes'] = {}
+		data['hash_algorithm'] = HASH_ALGORITHM
 		return cls(**data)
 	
 	@classmethod
@@ -150,6 +259,44 @@ def get_session_file_path(data_directory: Path) -> Path:
 	return data_directory / ".deadtrees-upload-session.json"
 
 
+def get_hash_cache_path(data_directory: Path) -> Path:
+	"""Get the path to the persistent file hash cache."""
+	return data_directory / ".deadtrees-upload-hashes.json"
+
+
+def load_hash_cache(path: Path) -> Dict[str, str]:
+	"""
+	Load cached file hashes written by save_hash_cache.
+	
+	Unlike the session state this cache outlives individual upload
+	sessions, so re-running on an unchanged directory skips hashing.
+	
+	Args:
+		path: Cache file path
+	
+	Returns:
+		Dict of get_hash_cache_key -> hash (empty if missing, unreadable, or
+		written with a different HASH_ALGORITHM)
+	"""
+	try:
+		with open(path, 'r') as f:
+			data = json.load(f)
+	except (OSError, ValueError):
+		return {}
+	
+	if not isinstance(data, dict) or data.get("hash_algorithm") != HASH_ALGORITHM:
+		return {}
+	return data.get("hashes", {})
+
+
+def save_hash_cache(path: Path, hashes: Dict[str, str]) -> None:
+	"""Write cached file hashes atomically."""
+	tmp = path.with_suffix(path.suffix + ".tmp")
+	with open(tmp, 'w') as f:
+		json.dump({"hash_algorithm": HASH_ALGORITHM, "hashes": hashes}, f, separators=(',', ':'))
+	os.replace(tmp, path)
+
+
 def find_existing_session(data_directory: Path) -> Optional[UploadSessionState]:
 	"""
 	Find an existing upload session for a directory.
@@ -171,29 +318,88 @@ def find_existing_session(data_directory: Path) -> Optional[UploadSessionState]:
 	return None
 
 
+def get_hash_cache_key(file_path: Path) -> str:
+	"""
+	Build the cache key under which a file's hash is stored.
+	
+	The key uses the resolved path, so files sharing a basename in different
+	directories don't collide, and includes size and modification time, so a
+	file that changes between runs is re-hashed instead of reusing a stale value.
+	
+	Args:
+		file_path: Path to the file
+	
+	Returns:
+		Key of the form "/resolved/path:size:mtime_ns"
+	"""
+	stat = file_path.stat()
+	return f"{file_path.resolve()}:{stat.st_size}:{stat.st_mtime_ns}"
+
+
 def calculate_file_hashes(
 	files: List[Path],
 	existing_hashes: Optional[Dict[str, str]] = None,
+	on_file_hashed: Optional[Callable[[Path, Optional[str], Optional[Exception]], None]] = None,
+	skip_unique: bool = False,
 ) -> Dict[str, str]:
 	"""
 	Calculate hashes for files, using cached values where available.
 	
 	Args:
 		files: List of file paths
-		existing_hashes: Previously calculated hashes
+		existing_hashes: Previously calculated hashes, keyed by get_hash_cache_key
+		on_file_hashed: Called as (path, hash, error) once per file; both
+			hash and error are None for files skipped by skip_unique
+		skip_unique: Don't hash uncached files whose quick identifier is
+			unique among files, since they cannot be duplicates in this batch
 	
 	Returns:
-		Dict of filename -> hash
+		Dict of cache key -> hash for every file that was hashed
 	"""
-	hashes = existing_hashes.copy() if existing_hashes else {}
+	cache = existing_hashes or {}
+	hashes = {}
+	todo = []
 	
 	for file_path in files:
-		filename = file_path.name
-		if filename not in hashes:
+		try:
+			key = get_hash_cache_key(file_path)
+		except OSError as e:
+			if on_file_hashed:
+				on_file_hashed(file_path, None, e)
+			continue
+		
+		if key in cache:
+			hashes[key] = cache[key]
+			if on_file_hashed:
+				on_file_hashed(file_path, cache[key], None)
+		else:
+			todo.append((key, file_path))
+	
+	if not todo:
+		return hashes
+	
+	if skip_unique:
+		candidates = find_possible_duplicates(files)
+		for key, file_path in todo:
+			if file_path not in candidates and on_file_hashed:
+				on_file_hashed(file_path, None, None)
+		todo = [(key, file_path) for key, file_path in todo if file_path in candidates]
+		if not todo:
+			return hashes
+	
+	# Hashing is disk-bound and hashlib releases the GIL, so threads overlap well
+	with ThreadPoolExecutor(max_workers=min(HASH_WORKERS, len(todo))) as executor:
+		futures = {executor.submit(get_file_identifier, f): (key, f) for key, f in todo}
+		for future in as_completed(futures):
+			key, file_path = futures[future]
 			try:
-				hashes[filename] = get_file_identifier(file_path)
-			except Exception:
-				pass  # Skip files that can't be hashed
+				hashes[key] = future.result()
+			except Exception as e:
+				if on_file_hashed:
+					on_file_hashed(file_path, None, e)
+				continue
+			if on_file_hashed:
+				on_file_hashed(file_path, hashes[key], None)
 	
 	return hashes
 
@@ -50,11 +50,8 @@ def show_validation_table(validation_results: List[ValidationResult]) -> tuple[i
 	error_count = 0
 	
 	for result in validation_results:
-		# Get file size
-		if result.metadata and result.metadata.file_path:
-			size = format_size(result.metadata.file_path.stat().st_size)
-		else:
-			size = "?"
+		# File size recorded during validation; no stat per row
+		size = format_size(result.file_size) if result.file_size is not None else "?"
 		
 		if result.errors:
 			status = "[red]✗ Error[/red]"
@@ -73,8 +70,7 @@ def show_validation_table(validation_results: List[ValidationResult]) -> tuple[i
 		table.add_row(result.filename[:40], size, status, issues[:50])
 	
 	console.print(table)
-	console.print()
-	console.print(f"Summary: [green]{valid_count} valid[/green], [yellow]{warning_count} warnings[/yellow], [red]{error_count} errors[/red]")
+	console.print(f"\nSummary: [green]{valid_count} valid[/green], [yellow]{warning_count} warnings[/yellow], [red]{error_count} errors[/red]")
 	
 	return valid_count, warning_count, error_count
 
@@ -85,65 +81,73 @@ def show_summary(upload_results: List[UploadResult], api_url: str):
 	console.rule("[bold]Upload Complete[/bold]", style="green")
 	console.print()
 	
-	success_count = sum(1 for r in upload_results if r.success)
-	failed_count = len(upload_results) - success_count
-	
-	console.print(f"[green]✓ Successful:[/green] {success_count}")
-	if failed_count:
-		console.print(f"[red]✗ Failed:[/red] {failed_count}")
-	
-	# Show failed uploads
 	failed = [r for r in upload_results if not r.success]
+	success_count = len(upload_results) - len(failed)
+	
+	# Collect lines and print once; each console.print runs the full render pipeline
+	lines = [f"[green]✓ Successful:[/green] {success_count}"]
 	if failed:
-		console.print()
-		console.print("[bold]Failed uploads:[/bold]")
-		for result in failed:
-			console.print(f"  • {result.filename}: {result.error}")
+		lines.append(f"[red]✗ Failed:[/red] {len(failed)}")
+		
+		# Show failed uploads
+		lines.append("")
+		lines.append("[bold]Failed uploads:[/bold]")
+		lines.extend(f"  • {result.filename}: {result.error}" for result in failed)
 	
-	console.print()
-	console.print("[bold]View your datasets at:[/bold]")
-	console.print("  https://deadtrees.earth/account")
-	console.print()
+	lines.append("")
+	lines.append("[bold]View your datasets at:[/bold]")
+	lines.append("  https://deadtrees.earth/account")
+	lines.append("")
+	console.print("\n".join(lines))
+
+
+def _print_list(header: str, items: List[str], total: int, trailing_blank: bool = True):
+	"""Print a header and bullet items in one console call, noting any not shown."""
+	lines = [header]
+	lines.extend(f"  • {item}" for item in items)
+	if total > len(items):
+		lines.append(f"  ... and {total - len(items)} more")
+	if trailing_blank:
+		lines.append("")
+	console.print("\n".join(lines))
 
 
 def show_parse_errors(parse_errors: List[tuple], max_show: int = 5):
 	"""Show metadata parse errors."""
 	if parse_errors:
-		console.print(f"[yellow]![/yellow] {len(parse_errors)} rows with errors:")
-		for row_num, error in parse_errors[:max_show]:
-			console.print(f"  • Row {row_num}: {error}")
-		if len(parse_errors) > max_show:
-			console.print(f"  ... and {len(parse_errors) - max_show} more")
-		console.print()
+		_print_list(
+			f"[yellow]![/yellow] {len(parse_errors)} rows with errors:",
+			[f"Row {row_num}: {error}" for row_num, error in parse_errors[:max_show]],
+			len(parse_errors),
+		)
 
 
 def show_unmatched_files(unmatched_files: List[str], max_show: int = 5):
 	"""Show files without metadata."""
 	if unmatched_files:
-		console.print(f"[yellow]![/yellow] {len(unmatched_files)} files without metadata:")
-		for filename in unmatched_files[:max_show]:
-			console.print(f"  • {filename}")
-		if len(unmatched_files) > max_show:
-			console.print(f"  ... and {len(unmatched_files) - max_show} more")
-		console.print()
+		_print_list(
+			f"[yellow]![/yellow] {len(unmatched_files)} files without metadata:",
+			unmatched_files[:max_show],
+			len(unmatched_files),
+		)
 
 
 def show_unmatched_metadata(unmatched_metadata: List[str], max_show: int = 5):
 	"""Show metadata entries without files."""
 	if unmatched_metadata:
-		console.print(f"[yellow]![/yellow] {len(unmatched_metadata)} metadata entries without files:")
-		for filename in unmatched_metadata[:max_show]:
-			console.print(f"  • {filename}")
-		if len(unmatched_metadata) > max_show:
-			console.print(f"  ... and {len(unmatched_metadata) - max_show} more")
-		console.print()
+		_print_list(
+			f"[yellow]![/yellow] {len(unmatched_metadata)} metadata entries without files:",
+			unmatched_metadata[:max_show],
+			len(unmatched_metadata),
+		)
 
 
 def show_duplicates(duplicates: List[tuple], max_show: int = 3):
 	"""Show duplicate files found in batch."""
 	if duplicates:
-		console.print(f"[yellow]![/yellow] Found {len(duplicates)} duplicate files (same content):")
-		for dup, orig in duplicates[:max_show]:
-			console.print(f"  • {dup} = {orig}")
-		if len(duplicates) > max_show:
-			console.print(f"  ... and {len(duplicates) - max_show} more")
+		_print_list(
+			f"[yellow]![/yellow] Found {len(duplicates)} duplicate files (same content):",
+			[f"{dup} = {orig}" for dup, orig in duplicates[:max_show]],
+			len(duplicates),
+			trailing_blank=False,
+		)
@@ -1,13 +1,42 @@
 """Metadata file parsing and column mapping."""
 
+import calendar
+import heapq
+import re
+from functools import cache
 from pathlib import Path
-from typing import Dict, List, Optional, Tuple
-from datetime import datetime
-import pandas as pd
-from pydantic import ValidationError
+from types import MappingProxyType
+from typing import TYPE_CHECKING, Dict, Iterable, List, Mapping, Optional, Sequence, Tuple, Union
+from pydantic import TypeAdapter, ValidationError
 
 from .models import FileMetadata, LicenseEnum, PlatformEnum, DataAccessEnum
 
+if TYPE_CHECKING:
+	# pandas is imported where files are read; it dominates this module's import time
+	import pandas as pd
+
+# A metadata table is either the DataFrame read_metadata_file returns or a
+# plain mapping of column name -> cell values, which skips pandas for callers
+# that already hold the columns (e.g. a handful of rows built in code)
+MetadataTable = Union["pd.DataFrame", Mapping[str, Sequence]]
+
+
+# Date layouts accepted by parse_date_string (separators can't be mixed within a date)
+_YMD_RE = re.compile(r"([0-9]{4})([-/])([0-9]{1,2})\2([0-9]{1,2})(?:T([0-9]{1,2}):([0-9]{1,2}):([0-9]{1,2}))?")
+_DMY_RE = re.compile(r"([0-9]{1,2})([-/])([0-9]{1,2})\2([0-9]{4})")
+_YM_RE = re.compile(r"(?P<year>[0-9]{4})[-/](?P<month>[0-9]{1,2})")
+_MY_RE = re.compile(r"(?P<month>[0-9]{1,2})[-/](?P<year>[0-9]{4})")
+
+
+def _is_valid_date(year: int, month: int, day: int) -> bool:
+	"""Check that year/month/day form a real calendar date."""
+	return year >= 1 and 1 <= month <= 12 and 1 <= day <= calendar.monthrange(year, month)[1]
+
+
+def _is_valid_time(hour: int, minute: int, second: int) -> bool:
+	"""Check that hour/minute/second form a valid time of day."""
+	return hour <= 23 and minute <= 59 and second <= 59
+
 
 def parse_date_string(date_str: str) -> Tuple[Optional[int], Optional[int], Optional[int]]:
 	"""
@@ -29,32 +58,31 @@ def parse_date_string(date_str: str) -> Tuple[Optional[int], Optional[int], Opti
 	
 	date_str = date_str.strip()
 	
-	# Try various formats
-	formats = [
-		("%Y-%m-%d", True),           # 2024-06-15
-		("%Y/%m/%d", True),           # 2024/06/15
-		("%d-%m-%Y", False),          # 15-06-2024
-		("%d/%m/%Y", False),          # 15/06/2024
-		("%Y-%m-%dT%H:%M:%S", True),  # ISO with time
-		("%Y-%m-%dT%H:%M:%S%z", True),  # ISO with timezone
-		("%Y-%m", True),              # 2024-06
-		("%Y/%m", True),              # 2024/06
-		("%m-%Y", False),             # 06-2024
-		("%m/%Y", False),             # 06/2024
-	]
-	
-	for fmt, _ in formats:
-		try:
-			# Handle timezone suffix like +00:00
-			clean_str = date_str.split('+')[0].split('Z')[0]
-			dt = datetime.strptime(clean_str, fmt.replace('%z', ''))
-			
-			# For formats without day, return None for day
-			if '%d' not in fmt:
-				return dt.year, dt.month, None
-			return dt.year, dt.month, dt.day
-		except ValueError:
-			continue
+	# Handle timezone suffix like +00:00
+	clean_str = date_str.partition('+')[0].partition('Z')[0]
+	
+	match = _YMD_RE.fullmatch(clean_str)
+	if match:
+		year, month, day = int(match[1]), int(match[3]), int(match[4])
+		if match[5] is not None and (match[2] != "-" or not _is_valid_time(int(match[5]), int(match[6]), int(match[7]))):
+			return None, None, None
+		if _is_valid_date(year, month, day):
+			return year, month, day
+		return None, None, None
+	
+	match = _DMY_RE.fullmatch(clean_str)
+	if match:
+		day, month, year = int(match[1]), int(match[3]), int(match[4])
+		if _is_valid_date(year, month, day):
+			return year, month, day
+		return None, None, None
+	
+	match = _YM_RE.fullmatch(clean_str) or _MY_RE.fullmatch(clean_str)
+	if match:
+		year, month = int(match["year"]), int(match["month"])
+		if year >= 1 and 1 <= month <= 12:
+			return year, month, None
+		return None, None, None
 	
 	# Try just year
 	try:
@@ -89,8 +117,64 @@ COLUMN_ALIASES: Dict[str, List[str]] = {
 
 REQUIRED_COLUMNS = ["filename", "license", "platform", "authors"]
 
+# Spreadsheet formats read_metadata_file accepts
+EXCEL_EXTENSIONS = frozenset({".xlsx", ".xls"})
+METADATA_EXTENSIONS = EXCEL_EXTENSIONS | {".csv"}
+
+# Validates a whole batch of parsed rows in a single pydantic-core call
+_FILE_METADATA_LIST = TypeAdapter(List[FileMetadata])
+
+# Per-value normalizers applied to whole columns before rows are built
+_COLUMN_NORMALIZERS = {
+	"license": FileMetadata.normalize_license,
+	"platform": FileMetadata.normalize_platform,
+}
+
+# Lowercase alias -> (standard name, position in that standard's alias list)
+_ALIAS_TO_STANDARD: Dict[str, Tuple[str, int]] = {
+	alias.lower(): (standard_name, rank)
+	for standard_name, aliases in COLUMN_ALIASES.items()
+	for rank, alias in enumerate(aliases)
+}
+
+
+def _read_csv(file_path: Path) -> "pd.DataFrame":
+	"""Read a CSV as strings, using pandas' multithreaded pyarrow engine when installed."""
+	import pandas as pd
+	
+	try:
+		import pyarrow  # noqa: F401
+	except ImportError:
+		return pd.read_csv(file_path, dtype=str)
+	
+	try:
+		return pd.read_csv(file_path, dtype=str, engine="pyarrow")
+	except Exception:
+		# pyarrow is stricter (e.g. ragged rows, empty files); let the C parser decide
+		return pd.read_csv(file_path, dtype=str)
+
+
+def _table_columns(table: MetadataTable) -> List[str]:
+	"""Column names of a metadata table."""
+	return list(table) if isinstance(table, Mapping) else list(table.columns)
+
+
+def _table_index(table: MetadataTable) -> Iterable[int]:
+	"""0-based row positions of a metadata table (the DataFrame index if it is one)."""
+	if isinstance(table, Mapping):
+		return range(max((len(values) for values in table.values()), default=0))
+	return table.index
 
-def read_metadata_file(file_path: Path) -> pd.DataFrame:
+
+def _column_values(table: MetadataTable, column: str) -> List:
+	"""Cell values of one column as a plain list, with missing cells as None."""
+	if isinstance(table, Mapping):
+		return list(table[column])
+	series = table[column]
+	return series.astype(object).where(series.notna(), None).tolist()
+
+
+def read_metadata_file(file_path: Path) -> "pd.DataFrame":
 	"""
 	Read metadata from CSV or Excel file.
 	
@@ -103,12 +187,14 @@ def read_metadata_file(file_path: Path) -> pd.DataFrame:
 	Raises:
 		MetadataError: If file cannot be read
 	"""
+	import pandas as pd
+	
 	suffix = file_path.suffix.lower()
 	
 	try:
 		if suffix == ".csv":
-			df = pd.read_csv(file_path, dtype=str)
-		elif suffix in [".xlsx", ".xls"]:
+			df = _read_csv(file_path)
+		elif suffix in EXCEL_EXTENSIONS:
 			df = pd.read_excel(file_path, dtype=str)
 		else:
 			raise MetadataError(f"Unsupported file format: {suffix}. Use .csv or .xlsx")
@@ -116,9 +202,7 @@ def read_metadata_file(file_path: Path) -> pd.DataFrame:
 		# Clean column names
 		df.columns = [str(col).strip().lower() for col in df.columns]
 		
-		# Replace NaN with None
-		df = df.where(pd.notna(df), None)
-		
+		# Missing cells are left as NaN; parse_metadata maps them to None per column
 		return df
 		
 	except pd.errors.EmptyDataError:
@@ -127,28 +211,27 @@ def read_metadata_file(file_path: Path) -> pd.DataFrame:
 		raise MetadataError(f"Error reading metadata file: {str(e)}")
 
 
-def find_column_mapping(df: pd.DataFrame) -> Tuple[Dict[str, str], List[str]]:
+def find_column_mapping(df: MetadataTable) -> Tuple[Dict[str, str], List[str]]:
 	"""
 	Find mapping between standard column names and actual column names.
 	
 	Args:
-		df: DataFrame with metadata
+		df: DataFrame or column mapping with metadata
 	
 	Returns:
 		Tuple of (mapping dict, list of missing required columns)
 	"""
-	mapping = {}
-	actual_columns = list(df.columns)
-	
-	for standard_name, aliases in COLUMN_ALIASES.items():
-		for alias in aliases:
-			alias_lower = alias.lower()
-			for actual_col in actual_columns:
-				if actual_col == alias_lower:
-					mapping[standard_name] = actual_col
-					break
-			if standard_name in mapping:
-				break
+	# standard name -> (alias rank, actual column); earlier aliases win
+	best: Dict[str, Tuple[int, str]] = {}
+	for actual_col in _table_columns(df):
+		entry = _ALIAS_TO_STANDARD.get(actual_col)
+		if entry is None:
+			continue
+		standard_name, rank = entry
+		if standard_name not in best or rank < best[standard_name][0]:
+			best[standard_name] = (rank, actual_col)
+	
+	mapping = {name: best[name][1] for name in COLUMN_ALIASES if name in best}
 	
 	# Check for missing required columns
 	missing = [col for col in REQUIRED_COLUMNS if col not in mapping]
@@ -156,23 +239,24 @@ def find_column_mapping(df: pd.DataFrame) -> Tuple[Dict[str, str], List[str]]:
 	return mapping, missing
 
 
-def suggest_column_matches(df: pd.DataFrame, target_column: str) -> List[str]:
+def suggest_column_matches(df: MetadataTable, target_column: str) -> List[str]:
 	"""
 	Suggest possible column matches for a missing required column.
 	
 	Args:
-		df: DataFrame with metadata
+		df: DataFrame or column mapping with metadata
 		target_column: The standard column name we're looking for
 	
 	Returns:
 		List of candidate column names from the DataFrame
 	"""
 	# Get columns not yet mapped
-	candidates = list(df.columns)
+	candidates = _table_columns(df)
 	
 	# Simple fuzzy matching based on substring
 	target_lower = target_column.lower()
 	scored = []
+	unscored = []
 	
 	for col in candidates:
 		col_lower = col.lower()
@@ -183,48 +267,88 @@ def suggest_column_matches(df: pd.DataFrame, target_column: str) -> List[str]:
 		elif target_lower in col_lower or col_lower in target_lower:
 			scored.append((col, 50))
 		# First letter match
-		elif col_lower[0] == target_lower[0]:
+		elif col_lower[:1] == target_lower[:1]:
 			scored.append((col, 10))
 		else:
-			scored.append((col, 0))
+			unscored.append(col)
 	
-	# Sort by score, then alphabetically
-	scored.sort(key=lambda x: (-x[1], x[0]))
+	# Best score first, then alphabetically; unscored columns only pad the list
+	top = [col for col, _ in heapq.nsmallest(5, scored, key=lambda x: (-x[1], x[0]))]
+	if len(top) < 5:
+		top.extend(heapq.nsmallest(5 - len(top), unscored))
 	
-	return [col for col, _ in scored[:5]]
+	return top
 
 
 def parse_metadata(
-	df: pd.DataFrame,
+	df: MetadataTable,
 	column_mapping: Dict[str, str],
 ) -> Tuple[List[FileMetadata], List[Tuple[int, str]]]:
 	"""
 	Parse DataFrame rows into FileMetadata objects.
 	
 	Args:
-		df: DataFrame with metadata
+		df: DataFrame or column mapping with metadata
 		column_mapping: Mapping from standard names to actual column names
 	
 	Returns:
 		Tuple of (list of valid FileMetadata, list of (row_index, error_message))
+	
+	Raises:
+		MetadataError: If the mapped columns of a column mapping differ in length
 	"""
-	metadata_list = []
+	pending = []  # (row_num, data) for rows that passed the required-field checks
 	errors = []
 	
-	for idx, row in df.iterrows():
+	# Pull each mapped column out once as a plain list (missing cells -> None)
+	# so the row loop never touches the DataFrame
+	present = set(_table_columns(df))
+	columns = {
+		standard_name: _column_values(df, actual_col)
+		for standard_name, actual_col in column_mapping.items()
+		if actual_col in present
+	}
+	index = _table_index(df)
+	
+	# A DataFrame is always rectangular; a plain mapping may not be, and
+	# zipping ragged columns would silently drop the extra rows
+	ragged = {name: len(values) for name, values in columns.items() if len(values) != len(index)}
+	if ragged:
+		raise MetadataError(
+			f"Metadata columns differ in length (expected {len(index)} rows): "
+			+ ", ".join(f"{column_mapping[name]} has {count}" for name, count in ragged.items())
+		)
+	
+	# Spreadsheets repeat the same few licenses, platforms and dates on every
+	# row, so normalize each distinct value once per column rather than per row
+	for standard_name, normalize in _COLUMN_NORMALIZERS.items():
+		if standard_name in columns:
+			values = columns[standard_name]
+			normalized = {value: normalize(value) for value in set(values) if isinstance(value, str)}
+			columns[standard_name] = [normalized.get(value, value) for value in values]
+	parsed_dates = {
+		value: parse_date_string(str(value))
+		for value in set(columns.get("acquisition_date", ()))
+		if value is not None
+	}
+	
+	rows = zip(*columns.values()) if columns else [()] * len(index)
+	
+	for idx, row_values in zip(index, rows):
 		row_num = idx + 2  # +2 for 1-based indexing and header row
 		
 		try:
 			# Build data dict from mapping
 			data = {}
-			for standard_name, actual_col in column_mapping.items():
-				value = row.get(actual_col)
-				if value is not None and str(value).strip():
-					data[standard_name] = value
+			for standard_name, value in zip(columns, row_values):
+				# Skip empty and whitespace-only cells without building stripped copies
+				if value is None or (isinstance(value, str) and (not value or value.isspace())):
+					continue
+				data[standard_name] = value
 			
 			# Handle date column - parse into year/month/day if present
 			if "acquisition_date" in data and data["acquisition_date"]:
-				year, month, day = parse_date_string(str(data["acquisition_date"]))
+				year, month, day = parsed_dates[data["acquisition_date"]]
 				if year and "acquisition_year" not in data:
 					data["acquisition_year"] = year
 				if month and "acquisition_month" not in data:
@@ -243,25 +367,37 @@ def parse_metadata(
 			if "acquisition_year" not in data or not data["acquisition_year"]:
 				raise ValueError("Missing required field: acquisition_year (provide acquisition_year or acquisition_date)")
 			
-			# Parse and validate
-			metadata = FileMetadata(**data)
-			metadata_list.append(metadata)
+			pending.append((row_num, data))
 			
-		except ValidationError as e:
-			error_msgs = "; ".join([f"{err['loc'][0]}: {err['msg']}" for err in e.errors()])
-			errors.append((row_num, error_msgs))
 		except ValueError as e:
 			errors.append((row_num, str(e)))
 		except Exception as e:
 			errors.append((row_num, f"Unexpected error: {str(e)}"))
 	
+	# Validate all complete rows in one pydantic call; only when that fails
+	# validate row by row to attribute errors to rows
+	try:
+		metadata_list = _FILE_METADATA_LIST.validate_python([data for _, data in pending])
+	except Exception:
+		metadata_list = []
+		for row_num, data in pending:
+			try:
+				metadata_list.append(FileMetadata.model_validate(data))
+			except ValidationError as e:
+				error_msgs = "; ".join([f"{err['loc'][0]}: {err['msg']}" for err in e.errors()])
+				errors.append((row_num, error_msgs))
+			except Exception as e:
+				errors.append((row_num, f"Unexpected error: {str(e)}"))
+		errors.sort(key=lambda error: error[0])
+	
 	return metadata_list, errors
 
 
-def get_valid_values_help() -> Dict[str, List[str]]:
-	"""Get valid values for enum fields."""
-	return {
-		"license": [e.value for e in LicenseEnum],
-		"platform": [e.value for e in PlatformEnum],
-		"data_access": [e.value for e in DataAccessEnum],
-	}
+@cache
+def get_valid_values_help() -> Mapping[str, Tuple[str, ...]]:
+	"""Get valid values for enum fields (cached, so the result is read-only)."""
+	return MappingProxyType({
+		"license": tuple(e.value for e in LicenseEnum),
+		"platform": tuple(e.value for e in PlatformEnum),
+		"data_access": tuple(e.value for e in DataAccessEnum),
+	})
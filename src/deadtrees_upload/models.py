@@ -70,6 +70,15 @@ PLATFORM_ALIASES = {
 }
 
 
+# Normalized token (see _normalize_token) -> enum member, covering both the
+# canonical spellings and the aliases so validators need a single lookup
+_LICENSE_LOOKUP = {_normalize_token(e.value): e for e in LicenseEnum} | LICENSE_ALIASES
+_PLATFORM_LOOKUP = {_normalize_token(e.value): e for e in PlatformEnum} | PLATFORM_ALIASES
+
+# Lowercased value -> enum member
+_DATA_ACCESS_LOOKUP = {e.value: e for e in DataAccessEnum}
+
+
 class FileMetadata(BaseModel):
 	"""Metadata for a single file to upload."""
 	
@@ -103,31 +112,20 @@ class FileMetadata(BaseModel):
 	@classmethod
 	def normalize_license(cls, v):
 		"""Normalize license string to enum value."""
+		if isinstance(v, LicenseEnum):
+			return v  # Already normalized, e.g. column-wise by parse_metadata
 		if isinstance(v, str):
-			alias_key = _normalize_token(v)
-			if alias_key in LICENSE_ALIASES:
-				return LICENSE_ALIASES[alias_key]
-			# Try exact match first
-			v_upper = v.upper().strip()
-			for license_type in LicenseEnum:
-				if license_type.value.upper() == v_upper:
-					return license_type
-			# Try without spaces
-			v_no_space = v_upper.replace(" ", "").replace("-", "")
-			for license_type in LicenseEnum:
-				if license_type.value.upper().replace(" ", "").replace("-", "") == v_no_space:
-					return license_type
+			return _LICENSE_LOOKUP.get(_normalize_token(v), v)
 		return v
 	
 	@field_validator("platform", mode="before")
 	@classmethod
 	def normalize_platform(cls, v):
 		"""Normalize platform string to enum value."""
+		if isinstance(v, PlatformEnum):
+			return v
 		if isinstance(v, str):
-			alias_key = _normalize_token(v)
-			if alias_key in PLATFORM_ALIASES:
-				return PLATFORM_ALIASES[alias_key]
-			return v.lower().strip()
+			return _PLATFORM_LOOKUP.get(_normalize_token(v), v.lower().strip())
 		return v
 	
 	@field_validator("data_access", mode="before")
@@ -135,7 +133,8 @@ class FileMetadata(BaseModel):
 	def normalize_data_access(cls, v):
 		"""Normalize data_access string to enum value."""
 		if isinstance(v, str):
-			return v.lower().strip()
+			v_lower = v.lower().strip()
+			return _DATA_ACCESS_LOOKUP.get(v_lower, v_lower)
 		if v is None:
 			return DataAccessEnum.public
 		return v
@@ -149,6 +148,7 @@ class ValidationResult(BaseModel):
 	warnings: List[str] = Field(default_factory=list)
 	errors: List[str] = Field(default_factory=list)
 	metadata: Optional[FileMetadata] = None
+	file_size: Optional[int] = None  # Bytes, recorded during validation
 
 
 class UploadResult(BaseModel):
@@ -1,11 +1,13 @@
 """Processing pipeline trigger logic."""
 
-from typing import Union, List
+import json
+from functools import lru_cache
+from typing import Union, List, Optional
 
 import httpx
 
 from .models import UploadType
-from .auth import AuthSession
+from .auth import AuthSession, get_shared_client
 
 
 # Processing task types for each upload type
@@ -44,12 +46,20 @@ def get_processing_tasks(upload_type: UploadType) -> List[str]:
 	return GEOTIFF_PROCESSING_TASKS
 
 
+@lru_cache(maxsize=None)
+def _encode_processing_request(upload_type: UploadType, priority: int) -> bytes:
+	"""Encode the processing request body; there are only a few distinct bodies per run."""
+	body = {"task_types": get_processing_tasks(upload_type), "priority": priority}
+	return json.dumps(body).encode()
+
+
 def trigger_processing(
 	dataset_id: int,
 	upload_type: UploadType,
 	token: Union[str, AuthSession],
 	api_url: str,
 	priority: int = 2,
+	client: Optional[httpx.Client] = None,
 ) -> bool:
 	"""
 	Trigger processing pipeline for an uploaded dataset.
@@ -60,34 +70,36 @@ def trigger_processing(
 		token: Authentication token or AuthSession
 		api_url: Base API URL
 		priority: Processing priority (1=highest, 2=default)
+		client: HTTP client to send the request with; defaults to the pooled
+			client for api_url, so a batch reuses one connection
 	
 	Returns:
 		True if processing was triggered successfully
 	"""
-	task_types = get_processing_tasks(upload_type)
-	
-	# Get token string
-	if isinstance(token, AuthSession):
-		token_str = token.get_valid_token()
-	else:
-		token_str = token
-	
 	process_url = api_url.rstrip("/") + f"/datasets/{dataset_id}/process"
 	
+	if client is None:
+		client = get_shared_client(api_url)
+	
 	try:
-		with httpx.Client(timeout=30.0) as client:
-			response = client.put(
-				process_url,
-				json={"task_types": task_types, "priority": priority},
-				headers={
-					"Authorization": f"Bearer {token_str}",
-					"Content-Type": "application/json",
-				},
-			)
-			
-			if response.status_code == 200:
-				return True
-			else:
-				return False
+		# Get Authorization header (may refresh the token, which can fail)
+		if isinstance(token, AuthSession):
+			auth_header = token.get_auth_header()
+		else:
+			auth_header = f"Bearer {token}"
+		
+		response = client.put(
+			process_url,
+			content=_encode_processing_request(upload_type, priority),
+			headers={
+				"Authorization": auth_header,
+				"Content-Type": "application/json",
+			},
+		)
+		
+		if response.status_code == 200:
+			return True
+		else:
+			return False
 	except Exception:
 		return False
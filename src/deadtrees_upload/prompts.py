@@ -1,5 +1,7 @@
 """Interactive prompts for CLI."""
 
+import os
+from collections import Counter
 from pathlib import Path
 from typing import Optional, List
 
@@ -18,6 +20,7 @@ from .auth import (
 from .metadata import (
 	suggest_column_matches,
 	get_valid_values_help,
+	METADATA_EXTENSIONS,
 	REQUIRED_COLUMNS,
 )
 from .validation import find_uploadable_files, ValidationError
@@ -27,6 +30,15 @@ from .display import print_step
 
 console = Console()
 
+# Enum values never change at runtime, so the help block is formatted once
+_ENUM_HELP_TEXT = "\n".join([
+	"[dim]Valid values for enum fields:[/dim]",
+	*(f"  • [bold]{field}[/bold]: {', '.join(values)}" for field, values in get_valid_values_help().items()),
+	"",
+	"[dim]Tip: Use Tab for autocomplete[/dim]",
+	"",
+])
+
 # Supabase configuration
 PROD_SUPABASE_URL = "https://supabase.deadtrees.earth"
 PROD_SUPABASE_KEY = "eyJhbGciOiJIUzI1NiIsInR5cCI6IkpXVCJ9.ewogICJyb2xlIjogImFub24iLAogICJpc3MiOiAic3VwYWJhc2UiLAogICJpYXQiOiAxNzQwODcwMDAwLAogICJleHAiOiAxODk4NjM2NDAwCn0.A3HdTofLNcrRrtDDbDAP9kRBobxXqnUKB6IYHvM6da4"
@@ -122,8 +134,9 @@ def select_data_directory() -> Path:
 			continue
 		
 		# Count by type
-		geotiff_count = sum(1 for t in file_types.values() if t == "GeoTIFF")
-		zip_count = sum(1 for t in file_types.values() if t == "ZIP")
+		type_counts = Counter(file_types.values())
+		geotiff_count = type_counts["GeoTIFF"]
+		zip_count = type_counts["ZIP"]
 		
 		console.print(f"[green]✓[/green] Found [bold]{len(files)}[/bold] files:")
 		if geotiff_count:
@@ -136,10 +149,12 @@ def select_data_directory() -> Path:
 
 def find_metadata_files_in_directory(directory: Path) -> List[Path]:
 	"""Find CSV and Excel files in a directory that might be metadata files."""
-	metadata_files = []
-	for pattern in ["*.csv", "*.xlsx", "*.xls"]:
-		metadata_files.extend(directory.glob(pattern))
-	return sorted(metadata_files)
+	with os.scandir(directory) as entries:
+		return sorted(
+			directory / entry.name
+			for entry in entries
+			if os.path.splitext(entry.name)[1].lower() in METADATA_EXTENSIONS and entry.is_file()
+		)
 
 
 def select_metadata_file(data_dir: Path) -> Path:
@@ -182,13 +197,7 @@ def select_metadata_file(data_dir: Path) -> Path:
 			console.print("[red]Invalid choice[/red]")
 	
 	# Show valid values for reference
-	valid_values = get_valid_values_help()
-	console.print("[dim]Valid values for enum fields:[/dim]")
-	for field, values in valid_values.items():
-		console.print(f"  • [bold]{field}[/bold]: {', '.join(values)}")
-	console.print()
-	console.print("[dim]Tip: Use Tab for autocomplete[/dim]")
-	console.print()
+	console.print(_ENUM_HELP_TEXT)
 	
 	while True:
 		try:
@@ -210,7 +219,7 @@ def select_metadata_file(data_dir: Path) -> Path:
 			console.print(f"[red]✗[/red] File does not exist: {path}")
 			continue
 		
-		if path.suffix.lower() not in [".csv", ".xlsx", ".xls"]:
+		if path.suffix.lower() not in METADATA_EXTENSIONS:
 			console.print(f"[red]✗[/red] Unsupported file format. Use .csv or .xlsx")
 			continue
 		
@@ -1,10 +1,13 @@
 """Template creation wizard for metadata files."""
 
 from pathlib import Path
-from typing import List, Dict, Tuple, Optional
+from typing import TYPE_CHECKING, List, Dict, Tuple, Optional
 from dataclasses import dataclass
+from functools import cached_property
+from concurrent.futures import ThreadPoolExecutor
+import os
+import re
 
-import pandas as pd
 from rich.console import Console
 from rich.table import Table
 from rich.prompt import Prompt, Confirm
@@ -14,9 +17,26 @@ from .validate_geotiff import extract_date_from_geotiff
 from .validate_zip import extract_date_from_zip
 from .models import LicenseEnum, PlatformEnum, DataAccessEnum
 
+if TYPE_CHECKING:
+	import pandas as pd
+
 
 console = Console()
 
+# Maximum number of files scanned for dates concurrently
+SCAN_WORKERS = min(32, (os.cpu_count() or 1) * 4)
+
+# Dates typed into the wizard: YYYY, YYYY-MM or YYYY-MM-DD
+_DATE_INPUT_RE = re.compile(r"([0-9]+)(?:-([0-9]+)(?:-([0-9]+))?)?")
+
+# Write buffer for saved templates
+TEMPLATE_WRITE_BUFFER = 1024 * 1024
+
+# Allowed values listed by ask_global_values
+_LICENSE_CHOICES = ", ".join(e.value for e in LicenseEnum)
+_PLATFORM_CHOICES = ", ".join(e.value for e in PlatformEnum)
+_ACCESS_CHOICES = ", ".join(e.value for e in DataAccessEnum)
+
 
 @dataclass
 class FileInfo:
@@ -30,6 +50,28 @@ class FileInfo:
 	confirmed_year: Optional[int] = None
 	confirmed_month: Optional[int] = None
 	confirmed_day: Optional[int] = None
+	
+	@cached_property
+	def detected_date_str(self) -> str:
+		"""Detected date formatted for display ("-" if none)."""
+		return format_date(self.detected_year, self.detected_month, self.detected_day)
+
+
+def _scan_file(file_path: Path, file_type: str) -> FileInfo:
+	"""Extract the acquisition date from a single file."""
+	if file_type == "GeoTIFF":
+		year, month, day = extract_date_from_geotiff(file_path)
+	else:  # ZIP
+		year, month, day = extract_date_from_zip(file_path)
+	
+	return FileInfo(
+		filename=file_path.name,
+		file_path=file_path,
+		file_type=file_type,
+		detected_year=year,
+		detected_month=month,
+		detected_day=day,
+	)
 
 
 def scan_files_with_dates(data_path: Path) -> List[FileInfo]:
@@ -44,41 +86,30 @@ def scan_files_with_dates(data_path: Path) -> List[FileInfo]:
 	"""
 	files, file_types = find_uploadable_files(data_path)
 	
-	file_infos = []
-	
 	console.print("\n[bold]Scanning files for date metadata...[/bold]")
 	
-	for file_path in files:
-		file_type = file_types[file_path.name]
-		
-		# Extract date based on file type
-		if file_type == "GeoTIFF":
-			year, month, day = extract_date_from_geotiff(file_path)
-		else:  # ZIP
-			year, month, day = extract_date_from_zip(file_path)
-		
-		file_infos.append(FileInfo(
-			filename=file_path.name,
-			file_path=file_path,
-			file_type=file_type,
-			detected_year=year,
-			detected_month=month,
-			detected_day=day,
-		))
+	if not files:
+		return []
 	
-	return file_infos
+	# Date extraction is I/O bound (rasterio and zipfile release the GIL), so
+	# files are scanned concurrently; map() keeps the input order
+	with ThreadPoolExecutor(max_workers=min(SCAN_WORKERS, len(files))) as executor:
+		return list(executor.map(
+			_scan_file,
+			files,
+			[file_types[file_path.name] for file_path in files],
+		))
 
 
 def format_date(year: Optional[int], month: Optional[int], day: Optional[int]) -> str:
 	"""Format date parts into a string."""
 	if not year:
 		return "-"
-	parts = [str(year)]
-	if month:
-		parts.append(f"{month:02d}")
-	if day:
-		parts.append(f"{day:02d}")
-	return "-".join(parts)
+	if not month:
+		return str(year)
+	if not day:
+		return f"{year}-{month:02d}"
+	return f"{year}-{month:02d}-{day:02d}"
 
 
 def show_detected_dates(file_infos: List[FileInfo]) -> None:
@@ -90,7 +121,7 @@ def show_detected_dates(file_infos: List[FileInfo]) -> None:
 	table.add_column("Status", justify="center")
 	
 	for info in file_infos:
-		date_str = format_date(info.detected_year, info.detected_month, info.detected_day)
+		date_str = info.detected_date_str
 		status = "[green]✓ Found[/green]" if info.detected_year else "[yellow]⚠ Not found[/yellow]"
 		table.add_row(info.filename[:40], info.file_type, date_str, status)
 	
@@ -99,11 +130,13 @@ def show_detected_dates(file_infos: List[FileInfo]) -> None:
 
 def confirm_dates(file_infos: List[FileInfo]) -> List[FileInfo]:
 	"""Confirm or edit dates for each file."""
-	console.print("\n[bold]Confirm or edit dates for each file:[/bold]")
-	console.print("[dim]Press Enter to accept, or type a new date (YYYY-MM-DD, YYYY-MM, or YYYY)[/dim]\n")
+	console.print(
+		"\n[bold]Confirm or edit dates for each file:[/bold]\n"
+		"[dim]Press Enter to accept, or type a new date (YYYY-MM-DD, YYYY-MM, or YYYY)[/dim]\n"
+	)
 	
 	for info in file_infos:
-		date_str = format_date(info.detected_year, info.detected_month, info.detected_day)
+		date_str = info.detected_date_str
 		status = f"[green]{date_str}[/green]" if info.detected_year else "[yellow]No date found[/yellow]"
 		console.print(f"  {info.filename}: {status}")
 		
@@ -127,16 +160,11 @@ def confirm_dates(file_infos: List[FileInfo]) -> List[FileInfo]:
 
 def parse_date_input(date_str: str) -> Tuple[Optional[int], Optional[int], Optional[int]]:
 	"""Parse a date string into year, month, day (supports YYYY-MM-DD, YYYY-MM, YYYY)."""
-	date_str = date_str.strip()
-	parts = date_str.split('-') if '-' in date_str else [date_str]
-	
-	try:
-		year = int(parts[0]) if parts[0] else None
-		month = int(parts[1]) if len(parts) > 1 else None
-		day = int(parts[2]) if len(parts) > 2 else None
-		return year, month, day
-	except (ValueError, IndexError):
+	match = _DATE_INPUT_RE.fullmatch(date_str.strip())
+	if not match:
 		return None, None, None
+	year, month, day = match.groups()
+	return int(year), int(month) if month else None, int(day) if day else None
 
 
 def ask_global_values() -> Dict[str, str]:
@@ -149,21 +177,18 @@ def ask_global_values() -> Dict[str, str]:
 	console.print("\n[bold]Enter values that apply to ALL files:[/bold]\n")
 	
 	# License
-	license_options = [e.value for e in LicenseEnum]
-	console.print(f"  Available licenses: {', '.join(license_options)}")
+	console.print(f"  Available licenses: {_LICENSE_CHOICES}")
 	license_val = Prompt.ask("  License", default="CC BY")
 	
 	# Platform
-	platform_options = [e.value for e in PlatformEnum]
-	console.print(f"  Available platforms: {', '.join(platform_options)}")
+	console.print(f"  Available platforms: {_PLATFORM_CHOICES}")
 	platform_val = Prompt.ask("  Platform", default="drone")
 	
 	# Authors
 	authors_val = Prompt.ask("  Authors (semicolon-separated)", default="")
 	
 	# Data access
-	access_options = [e.value for e in DataAccessEnum]
-	console.print(f"  Available access levels: {', '.join(access_options)}")
+	console.print(f"  Available access levels: {_ACCESS_CHOICES}")
 	access_val = Prompt.ask("  Data access", default="public")
 	
 	# Optional fields
@@ -190,7 +215,7 @@ def ask_global_values() -> Dict[str, str]:
 def create_template_dataframe(
 	file_infos: List[FileInfo],
 	global_values: Dict[str, str],
-) -> pd.DataFrame:
+) -> "pd.DataFrame":
 	"""
 	Create a template DataFrame from file info and global values.
 	
@@ -201,34 +226,38 @@ def create_template_dataframe(
 	Returns:
 		DataFrame ready to save as CSV
 	"""
-	rows = []
+	import pandas as pd
+	
+	n = len(file_infos)
+	
+	# Built column by column; nullable Int64 keeps missing dates empty in the
+	# CSV instead of turning the whole column into floats ("2024.0")
+	data = {
+		"filename": [info.filename for info in file_infos],
+		"license": [global_values["license"]] * n,
+		"platform": [global_values["platform"]] * n,
+		"authors": [global_values["authors"]] * n,
+		"acquisition_year": pd.array([info.confirmed_year for info in file_infos], dtype="Int64"),
+		"acquisition_month": pd.array([info.confirmed_month for info in file_infos], dtype="Int64"),
+		"acquisition_day": pd.array([info.confirmed_day for info in file_infos], dtype="Int64"),
+		"data_access": [global_values["data_access"]] * n,
+	}
 	
-	for info in file_infos:
-		row = {
-			"filename": info.filename,
-			"license": global_values["license"],
-			"platform": global_values["platform"],
-			"authors": global_values["authors"],
-			"acquisition_year": info.confirmed_year,
-			"acquisition_month": info.confirmed_month,
-			"acquisition_day": info.confirmed_day,
-			"data_access": global_values["data_access"],
-		}
-		
-		# Only add optional columns if they have values
-		if "additional_information" in global_values:
-			row["additional_information"] = global_values["additional_information"]
-		if "citation_doi" in global_values:
-			row["citation_doi"] = global_values["citation_doi"]
-		
-		rows.append(row)
+	# Only add optional columns if they have values
+	if "additional_information" in global_values:
+		data["additional_information"] = [global_values["additional_information"]] * n
+	if "citation_doi" in global_values:
+		data["citation_doi"] = [global_values["citation_doi"]] * n
 	
-	return pd.DataFrame(rows)
+	return pd.DataFrame(data)
 
 
-def save_template(df: pd.DataFrame, output_path: Path) -> None:
+def save_template(df: "pd.DataFrame", output_path: Path) -> None:
 	"""Save template DataFrame to CSV."""
-	df.to_csv(output_path, index=False)
+	# newline="" lets the writer control line endings; one large buffer means
+	# a single write for typical templates
+	with open(output_path, "w", encoding="utf-8", newline="", buffering=TEMPLATE_WRITE_BUFFER) as fh:
+		df.to_csv(fh, index=False, lineterminator="\n")
 	console.print(f"\n[green]✓[/green] Template saved to: {output_path}")
 
 
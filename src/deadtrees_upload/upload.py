@@ -1,15 +1,23 @@
 """Chunked upload logic for datasets."""
 
+import io
+import mmap
+import os
 import uuid
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from contextlib import nullcontext
+from importlib.util import find_spec
 from pathlib import Path
-from typing import Optional, Union
+from typing import TYPE_CHECKING, Optional, Tuple, Union
 
 import httpx
-from rich.progress import Progress, TaskID
 
 from .models import FileMetadata, UploadResult
 from .auth import AuthSession
 
+if TYPE_CHECKING:
+	from rich.progress import Progress, TaskID
+
 
 class UploadError(Exception):
 	"""Upload error."""
@@ -19,6 +27,90 @@ class UploadError(Exception):
 # Default chunk size: 100MB
 DEFAULT_CHUNK_SIZE = 100 * 1024 * 1024
 
+# Chunks of one file uploaded concurrently. Sequential by default: the
+# backend's chunk endpoint is only known to handle chunks in index order
+DEFAULT_PARALLEL_CHUNKS = 1
+
+# Longest raw response body quoted in upload errors
+MAX_ERROR_DETAIL_CHARS = 512
+
+# HTTP/2 needs the optional h2 package (installed with httpx[http2])
+HTTP2_AVAILABLE = find_spec("h2") is not None
+
+
+class ChunkReader(io.RawIOBase):
+	"""
+	Read-only, seekable stream over one chunk of a memory-mapped file.
+	
+	Passed to httpx as the multipart file so the chunk is streamed straight
+	from the page cache in small blocks instead of being read into memory as
+	one bytes object. Seeking back to the start lets httpx re-send the chunk
+	on retry.
+	"""
+	
+	def __init__(self, view: memoryview):
+		self._view = view
+		self._pos = 0
+	
+	def readable(self) -> bool:
+		return True
+	
+	def seekable(self) -> bool:
+		return True
+	
+	def tell(self) -> int:
+		return self._pos
+	
+	def seek(self, pos: int, whence: int = os.SEEK_SET) -> int:
+		if whence == os.SEEK_CUR:
+			pos += self._pos
+		elif whence == os.SEEK_END:
+			pos += len(self._view)
+		self._pos = min(max(pos, 0), len(self._view))
+		return self._pos
+	
+	def read(self, size: int = -1) -> bytes:
+		# Slice the mapping directly: one copy into the bytes httpx sends,
+		# instead of RawIOBase's bytearray + readinto + bytes round trip
+		end = len(self._view) if size is None or size < 0 else self._pos + size
+		data = bytes(self._view[self._pos:end])
+		self._pos += len(data)
+		return data
+	
+	def readinto(self, buffer) -> int:
+		data = self._view[self._pos:self._pos + len(buffer)]
+		n = len(data)
+		buffer[:n] = data
+		self._pos += n
+		return n
+
+
+def _error_detail(response: httpx.Response) -> str:
+	"""Get the API's error detail, or the start of the body for non-JSON errors."""
+	try:
+		data = response.json()
+		if isinstance(data, dict) and "detail" in data:
+			return str(data["detail"])
+	except ValueError:
+		pass
+	# Keep HTML error pages from flooding the console
+	return response.text[:MAX_ERROR_DETAIL_CHARS]
+
+
+def create_upload_client() -> httpx.Client:
+	"""
+	Create an HTTP client for chunk uploads.
+	
+	Uses HTTP/2 when h2 is installed so concurrent chunks are multiplexed
+	over one TLS connection. Pass the client to upload_file to reuse the
+	connection pool across files.
+	"""
+	return httpx.Client(
+		http2=HTTP2_AVAILABLE,
+		timeout=httpx.Timeout(timeout=300.0),
+		limits=httpx.Limits(max_keepalive_connections=8),
+	)
+
 
 def format_size(size_bytes: int) -> str:
 	"""Format file size in human-readable format."""
@@ -37,14 +129,19 @@ def upload_file(
 	token: Union[str, AuthSession],
 	api_url: str,
 	chunk_size: int = DEFAULT_CHUNK_SIZE,
-	progress: Optional[Progress] = None,
-	task_id: Optional[TaskID] = None,
+	progress: Optional["Progress"] = None,
+	task_id: Optional["TaskID"] = None,
 	max_retries: int = 3,
+	parallel_chunks: int = DEFAULT_PARALLEL_CHUNKS,
+	client: Optional[httpx.Client] = None,
 ) -> UploadResult:
 	"""
 	Upload a single file with chunked upload.
 	
-	Supports automatic token refresh when using AuthSession.
+	Supports automatic token refresh when using AuthSession. Chunks are sent
+	in order unless parallel_chunks > 1, in which case all chunks except the
+	last may arrive out of order; the last one is always sent after the rest
+	have succeeded.
 	
 	Args:
 		metadata: File metadata including file_path
@@ -54,6 +151,10 @@ def upload_file(
 		progress: Optional Rich Progress instance for updates
 		task_id: Optional task ID for progress updates
 		max_retries: Maximum retries per chunk on failure
+		parallel_chunks: Number of chunks uploaded at the same time; only raise
+			this for servers that place chunks by chunk_index
+		client: Optional shared client (see create_upload_client); a new one
+			is created and closed per call if omitted
 	
 	Returns:
 		UploadResult with success status and dataset ID
@@ -67,14 +168,15 @@ def upload_file(
 	
 	file_path = metadata.file_path
 	
-	if not file_path.exists():
+	try:
+		file_size = file_path.stat().st_size
+	except FileNotFoundError:
 		return UploadResult(
 			filename=metadata.filename,
 			success=False,
 			error="File does not exist",
 		)
 	
-	file_size = file_path.stat().st_size
 	chunks_total = (file_size + chunk_size - 1) // chunk_size
 	upload_id = str(uuid.uuid4())
 	
@@ -106,112 +208,146 @@ def upload_file(
 	if metadata.upload_type:
 		base_form_data["upload_type"] = metadata.upload_type.value
 	
-	def get_token() -> str:
-		"""Get current valid token, refreshing if needed."""
+	base_form_data["chunks_total"] = str(chunks_total)
+	
+	static_auth_header = f"Bearer {token}" if isinstance(token, str) else ""
+	
+	def get_auth_header() -> str:
+		"""Get Authorization header for the current valid token, refreshing if needed."""
 		if isinstance(token, AuthSession):
-			return token.get_valid_token()
-		return token
+			return token.get_auth_header()
+		return static_auth_header
 	
-	try:
-		with open(file_path, "rb") as f, httpx.Client(timeout=httpx.Timeout(timeout=300.0)) as client:
-			bytes_uploaded = 0
+	def chunk_length(chunk_index: int) -> int:
+		return min(chunk_size, file_size - chunk_index * chunk_size)
+	
+	def send_chunk(client: httpx.Client, data: memoryview, chunk_index: int) -> Tuple[Optional[httpx.Response], Optional[str]]:
+		"""Upload one chunk with retries. Returns (response, None) or (None, error)."""
+		# Prepare form data for this chunk (copied, as chunks run concurrently)
+		form_data = base_form_data.copy()
+		form_data["chunk_index"] = str(chunk_index)
+		
+		offset = chunk_index * chunk_size
+		
+		# The slice must be released before the mapping can be closed
+		with data[offset:offset + chunk_length(chunk_index)] as view:
+			# Build the request once; retries re-send it (the multipart stream
+			# rewinds the chunk) with only the Authorization header updated
+			request = client.build_request(
+				"POST",
+				upload_url,
+				data=form_data,
+				files={
+					"file": (file_path.name, ChunkReader(view), "application/octet-stream"),
+				},
+			)
 			
-			for chunk_index in range(chunks_total):
-				chunk_data = f.read(chunk_size)
-				
-				# Prepare form data for this chunk
-				form_data = {
-					**base_form_data,
-					"chunk_index": str(chunk_index),
-					"chunks_total": str(chunks_total),
-				}
-				
-				# Prepare file upload
-				files = {
-					"file": (file_path.name, chunk_data, "application/octet-stream"),
-				}
-				
-				# Retry loop for this chunk
-				last_error = None
-				for retry in range(max_retries):
-					try:
-						# Get fresh token (may refresh if expired)
-						current_token = get_token()
-						
-						# Send chunk
-						response = client.post(
-							upload_url,
-							data=form_data,
-							files=files,
-							headers={"Authorization": f"Bearer {current_token}"},
-						)
-						
-						# Handle 401 - try token refresh
-						if response.status_code == 401:
-							if isinstance(token, AuthSession):
-								try:
-									token.refresh()
-									continue  # Retry with new token
-								except Exception:
-									pass
-							return UploadResult(
-								filename=metadata.filename,
-								success=False,
-								error="Authentication failed - please re-login",
-							)
-						
-						if response.status_code >= 400:
-							error_detail = response.text
+			# Retry loop for this chunk
+			last_error = None
+			for retry in range(max_retries):
+				try:
+					# Send chunk (token may refresh if expired)
+					auth_header = get_auth_header()
+					request.headers["Authorization"] = auth_header
+					response = client.send(request)
+					
+					status_code = response.status_code
+					
+					# Handle 401 - try token refresh
+					if status_code == 401:
+						if isinstance(token, AuthSession):
 							try:
-								error_detail = response.json().get("detail", response.text)
+								token.refresh_if_unchanged(auth_header)
+								last_error = "Authentication failed - please re-login"
+								continue  # Retry with new token
 							except Exception:
 								pass
-							last_error = f"Upload failed (chunk {chunk_index + 1}/{chunks_total}): {error_detail}"
-							continue  # Retry
-						
-						response.raise_for_status()
-						
-						# Success - break retry loop
-						last_error = None
-						break
-						
-					except httpx.TimeoutException:
-						last_error = f"Timeout on chunk {chunk_index + 1}/{chunks_total}"
-						continue  # Retry
-					except httpx.ConnectError:
-						last_error = f"Connection error on chunk {chunk_index + 1}/{chunks_total}"
+						return None, "Authentication failed - please re-login"
+					
+					if status_code >= 400:
+						last_error = f"Upload failed (chunk {chunk_index + 1}/{chunks_total}): {_error_detail(response)}"
 						continue  # Retry
-				
-				# If all retries failed
-				if last_error:
-					return UploadResult(
-						filename=metadata.filename,
-						success=False,
-						error=last_error,
-					)
-				
-				# Update progress
-				bytes_uploaded += len(chunk_data)
-				if progress and task_id is not None:
-					progress.update(task_id, completed=bytes_uploaded)
-				
-				# On final chunk, get dataset info
-				if chunk_index == chunks_total - 1:
-					result_data = response.json()
-					dataset_id = result_data.get("id")
 					
-					return UploadResult(
-						filename=metadata.filename,
-						success=True,
-						dataset_id=dataset_id,
-					)
+					response.raise_for_status()
+					return response, None
+					
+				except httpx.TimeoutException:
+					last_error = f"Timeout on chunk {chunk_index + 1}/{chunks_total}"
+					continue  # Retry
+				except httpx.ConnectError:
+					last_error = f"Connection error on chunk {chunk_index + 1}/{chunks_total}"
+					continue  # Retry
 		
-		# Should not reach here
-		return UploadResult(
-			filename=metadata.filename,
-			success=False,
-			error="Upload completed but no response received",
-		)
+		return None, last_error
+	
+	try:
+		if chunks_total == 0:
+			# Should not reach here
+			return UploadResult(
+				filename=metadata.filename,
+				success=False,
+				error="Upload completed but no response received",
+			)
+		
+		with (
+			open(file_path, "rb") as f,
+			mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm,
+			memoryview(mm) as data,
+			nullcontext(client) if client else create_upload_client() as client,
+		):
+			if hasattr(mmap, "MADV_SEQUENTIAL"):
+				mm.madvise(mmap.MADV_SEQUENTIAL)
+			
+			bytes_uploaded = 0
+			
+			# All chunks but the last go out through the pool; one worker keeps them in order
+			with ThreadPoolExecutor(max_workers=max(1, parallel_chunks)) as executor:
+				futures = {
+					executor.submit(send_chunk, client, data, chunk_index): chunk_index
+					for chunk_index in range(chunks_total - 1)
+				}
+				
+				for future in as_completed(futures):
+					_, error = future.result()
+					
+					# If all retries failed
+					if error:
+						for pending in futures:
+							pending.cancel()
+						return UploadResult(
+							filename=metadata.filename,
+							success=False,
+							error=error,
+						)
+					
+					# Update progress
+					bytes_uploaded += chunk_length(futures[future])
+					if progress and task_id is not None:
+						progress.update(task_id, completed=bytes_uploaded)
+			
+			# The final chunk is sent only once all others are stored, since the
+			# server assembles the file when it arrives
+			response, error = send_chunk(client, data, chunks_total - 1)
+			if error:
+				return UploadResult(
+					filename=metadata.filename,
+					success=False,
+					error=error,
+				)
+			
+			bytes_uploaded += chunk_length(chunks_total - 1)
+			if progress and task_id is not None:
+				progress.update(task_id, completed=bytes_uploaded)
+			
+			# On final chunk, get dataset info
+			result_data = response.json()
+			dataset_id = result_data.get("id")
+			
+			return UploadResult(
+				filename=metadata.filename,
+				success=True,
+				dataset_id=dataset_id,
+			)
 		
 	except httpx.ConnectError:
 		return UploadResult(
@@ -1,12 +1,246 @@
 """GeoTIFF file validation."""
 
+import os
+import re
+import struct
+from functools import lru_cache
 from pathlib import Path
-from typing import Tuple, Optional
+from typing import Collection, Dict, FrozenSet, Tuple, Optional
 from datetime import datetime
 
 from .models import ValidationResult
 
 
+# Number of (path, mtime, size) date lookups kept in memory
+DATE_CACHE_SIZE = 1024
+
+# TIFF tag ids read by the lightweight header parser
+TIFFTAG_DATETIME = 306
+TIFFTAG_GDAL_METADATA = 42112
+
+# Bytes read up front by the header parser; the first IFD and its small
+# tag values normally sit well inside this, so one read covers them
+TIFF_HEADER_READ_SIZE = 128 * 1024
+
+# Largest tag value or directory the header parser will load; sizes come
+# straight from the file, so a corrupt count must not pull in the whole file
+MAX_TAG_VALUE_SIZE = 1024 * 1024
+
+# Size in bytes of one value of each TIFF field type
+_TIFF_TYPE_SIZES = {1: 1, 2: 1, 3: 2, 4: 4, 5: 8, 6: 1, 7: 1, 8: 2, 9: 4, 10: 8, 11: 4, 12: 8, 16: 8, 17: 8, 18: 8}
+
+# GeoKeyDirectory, ModelPixelScale, ModelTiepoint, ModelTransformation
+GEOREFERENCING_TAGS = (34735, 33550, 33922, 34264)
+
+# Sidecar files GDAL reads georeferencing from
+GEOREFERENCING_SIDECARS = (".aux.xml", ".prj", ".tfw", ".tifw", ".wld")
+
+NO_GEOREFERENCING_ERROR = (
+	"File has no coordinate reference system (CRS) or georeferencing. "
+	"This appears to be a plain image, not a georeferenced orthomosaic. "
+	"Please upload a GeoTIFF with embedded CRS."
+)
+
+# Dataset-level <Item> entries in the GDAL_METADATA XML (band items carry a sample attribute)
+_GDAL_ITEM_RE = re.compile(r'<Item name="([^"]+)"\s*>([^<]*)</Item>')
+
+
+def _read_first_ifd(file_path: Path, value_tags: Collection[int] = ()) -> Dict[int, Optional[bytes]]:
+	"""
+	Parse the TIFF header and list the tags of the first image file directory.
+	
+	Only the values of value_tags are read, so large arrays such as tile
+	offsets of big orthomosaics are never loaded. Handles classic TIFF and
+	BigTIFF in either byte order.
+	
+	Args:
+		file_path: Path to TIFF file
+		value_tags: Tag ids whose raw value bytes should be returned
+	
+	Returns:
+		Dictionary of every tag id in the IFD to its raw value bytes, or None
+		for tags not in value_tags
+	
+	Raises:
+		ValueError: If the file is not a TIFF, the IFD is truncated, or a
+			requested value is larger than MAX_TAG_VALUE_SIZE
+	"""
+	with open(file_path, 'rb') as fp:
+		buffer = fp.read(TIFF_HEADER_READ_SIZE)
+		
+		def read_at(offset: int, size: int) -> bytes:
+			if offset + size <= len(buffer):
+				return buffer[offset:offset + size]
+			fp.seek(offset)
+			data = fp.read(size)
+			if len(data) != size:
+				raise ValueError("Truncated TIFF directory")
+			return data
+		
+		byte_order = {b'II': '<', b'MM': '>'}.get(buffer[:2])
+		if byte_order is None or len(buffer) < 8:
+			raise ValueError("Not a TIFF file")
+		
+		version = struct.unpack_from(byte_order + 'H', buffer, 2)[0]
+		if version == 42:
+			ifd_offset = struct.unpack_from(byte_order + 'I', buffer, 4)[0]
+			count_format, entry_format, value_field_size = 'H', 'HHII', 4
+		elif version == 43 and len(buffer) >= 16:
+			# BigTIFF: 8-byte offset to the first IFD follows the version word
+			ifd_offset = struct.unpack_from(byte_order + 'Q', buffer, 8)[0]
+			count_format, entry_format, value_field_size = 'Q', 'HHQQ', 8
+		else:
+			raise ValueError("Not a TIFF file")
+		
+		count_size = struct.calcsize(count_format)
+		entry_size = struct.calcsize('=' + entry_format)
+		entry_count = struct.unpack(byte_order + count_format, read_at(ifd_offset, count_size))[0]
+		if entry_count * entry_size > MAX_TAG_VALUE_SIZE:
+			raise ValueError("TIFF directory too large")
+		entries = read_at(ifd_offset + count_size, entry_count * entry_size)
+		
+		tags = {}
+		for index, (tag, field_type, value_count, value_offset) in enumerate(
+			struct.iter_unpack(byte_order + entry_format, entries)
+		):
+			tags[tag] = None
+			if tag not in value_tags or field_type not in _TIFF_TYPE_SIZES:
+				continue
+			size = value_count * _TIFF_TYPE_SIZES[field_type]
+			if size > MAX_TAG_VALUE_SIZE:
+				raise ValueError(f"TIFF tag {tag} value too large ({size} bytes)")
+			if size <= value_field_size:
+				# Small values are stored inline in the entry's offset field
+				value_start = (index + 1) * entry_size - value_field_size
+				tags[tag] = entries[value_start:value_start + size]
+			else:
+				tags[tag] = read_at(value_offset, size)
+	
+	return tags
+
+
+def _read_tiff_tags(file_path: Path) -> Dict[str, str]:
+	"""
+	Read date-related tags from the first IFD without opening a raster dataset.
+	
+	Only the TIFF header and first image file directory are parsed, so no
+	CRS objects or dataset handles are created. Keys match the names
+	rasterio's ``tags()`` would report.
+	
+	Args:
+		file_path: Path to GeoTIFF file
+	
+	Returns:
+		Dictionary of tag name to string value
+	
+	Raises:
+		Exception: If the header or IFD cannot be parsed
+	"""
+	ifd = _read_first_ifd(file_path, (TIFFTAG_DATETIME, TIFFTAG_GDAL_METADATA))
+	tags = {}
+	
+	gdal_metadata = ifd.get(TIFFTAG_GDAL_METADATA)
+	if gdal_metadata:
+		tags.update(_GDAL_ITEM_RE.findall(gdal_metadata.decode('utf-8', 'replace')))
+	
+	datetime_tag = ifd.get(TIFFTAG_DATETIME)
+	if datetime_tag:
+		tags['TIFFTAG_DATETIME'] = datetime_tag.decode('ascii', 'replace').strip('\x00 ')
+	
+	return tags
+
+
+def _lacks_georeferencing(file_path: Path) -> bool:
+	"""
+	Cheaply tell whether a TIFF certainly has no georeferencing.
+	
+	True only if the first IFD has none of the GeoTIFF tags and there are no
+	sidecar files GDAL could take a CRS or transform from. Any doubt
+	(unparseable header, sidecars present) returns False so the caller
+	does the full rasterio check.
+	"""
+	try:
+		ifd = _read_first_ifd(file_path)
+	except Exception:
+		return False
+	
+	if any(tag in ifd for tag in GEOREFERENCING_TAGS):
+		return False
+	
+	try:
+		directory = file_path.parent
+		entries = _lowercase_dir_entries(str(directory), directory.stat().st_mtime_ns)
+	except OSError:
+		return False
+	
+	# Sidecar names are matched case-insensitively (ORTHO.TIF + ORTHO.TFW)
+	name = file_path.name.lower()
+	stem = file_path.stem.lower()
+	return not any(
+		name + ext in entries or stem + ext in entries
+		for ext in GEOREFERENCING_SIDECARS
+	)
+
+
+@lru_cache(maxsize=16)
+def _lowercase_dir_entries(directory: str, mtime_ns: int) -> FrozenSet[str]:
+	"""
+	List a directory's entry names in lower case.
+	
+	mtime_ns only keys the cache (it changes when entries are added or
+	removed), so validating many files in one directory lists it once.
+	"""
+	with os.scandir(directory) as entries:
+		return frozenset(entry.name.lower() for entry in entries)
+
+
+def _read_rasterio_tags(file_path: Path) -> Dict[str, str]:
+	"""Read dataset tags by fully opening the file with rasterio."""
+	import rasterio
+	
+	with rasterio.open(file_path) as src:
+		return src.tags()
+
+
+@lru_cache(maxsize=DATE_CACHE_SIZE)
+def _extract_date_cached(path: str, mtime_ns: int, size: int) -> Tuple[Optional[int], Optional[int], Optional[int]]:
+	"""
+	Extract the date for one version of a file.
+	
+	mtime_ns and size are only part of the cache key, so an edited file
+	gets a fresh lookup while repeated calls on an unchanged file are free.
+	"""
+	file_path = Path(path)
+	try:
+		try:
+			tags = _read_tiff_tags(file_path)
+		except Exception:
+			tags = _read_rasterio_tags(file_path)
+		
+		# Check for acquisition dates (ODM processed files)
+		date_str = tags.get('acquisitionStartDate') or tags.get('acquisitionEndDate')
+		
+		# Check for TIFF DateTime
+		if not date_str:
+			date_str = tags.get('TIFFTAG_DATETIME') or tags.get('DateTime')
+		
+		if date_str:
+			# Parse ISO format: 2019-09-29T01:48:04+00:00
+			try:
+				# Remove timezone suffix
+				clean_str = date_str.split('+')[0].split('Z')[0]
+				
+				# Handles both date-only and date-time ISO strings
+				dt = datetime.fromisoformat(clean_str)
+				return dt.year, dt.month, dt.day
+			except ValueError:
+				pass
+		
+		return None, None, None
+	except Exception:
+		return None, None, None
+
+
 def extract_date_from_geotiff(file_path: Path) -> Tuple[Optional[int], Optional[int], Optional[int]]:
 	"""
 	Try to extract acquisition date from GeoTIFF metadata.
@@ -16,6 +250,12 @@ def extract_date_from_geotiff(file_path: Path) -> Tuple[Optional[int], Optional[
 	- TIFFTAG_DATETIME
 	- DateTimeOriginal
 	
+	Tags are read straight from the TIFF header; rasterio is only used
+	if the header cannot be parsed.
+	
+	Results are memoized per (path, mtime, size), so scanning and
+	validating the same file only reads it once.
+	
 	Args:
 		file_path: Path to GeoTIFF file
 	
@@ -23,37 +263,11 @@ def extract_date_from_geotiff(file_path: Path) -> Tuple[Optional[int], Optional[
 		Tuple of (year, month, day) - any can be None if not found
 	"""
 	try:
-		import rasterio
-		
-		with rasterio.open(file_path) as src:
-			tags = src.tags()
-			
-			# Check for acquisition dates (ODM processed files)
-			date_str = tags.get('acquisitionStartDate') or tags.get('acquisitionEndDate')
-			
-			# Check for TIFF DateTime
-			if not date_str:
-				date_str = tags.get('TIFFTAG_DATETIME') or tags.get('DateTime')
-			
-			if date_str:
-				# Parse ISO format: 2019-09-29T01:48:04+00:00
-				try:
-					# Remove timezone suffix
-					clean_str = date_str.split('+')[0].split('Z')[0]
-					
-					# Try ISO format
-					if 'T' in clean_str:
-						dt = datetime.strptime(clean_str, "%Y-%m-%dT%H:%M:%S")
-					else:
-						dt = datetime.strptime(clean_str, "%Y-%m-%d")
-					
-					return dt.year, dt.month, dt.day
-				except ValueError:
-					pass
-			
-			return None, None, None
-	except Exception:
+		stat = file_path.stat()
+	except OSError:
 		return None, None, None
+	
+	return _extract_date_cached(str(file_path.resolve()), stat.st_mtime_ns, stat.st_size)
 
 
 def validate_geotiff(file_path: Path) -> Tuple[ValidationResult, Tuple[Optional[int], Optional[int], Optional[int]]]:
@@ -76,7 +290,10 @@ def validate_geotiff(file_path: Path) -> Tuple[ValidationResult, Tuple[Optional[
 	errors = []
 	extracted_date = (None, None, None)
 	
-	if not file_path.exists():
+	# A single stat both checks existence and gives the size
+	try:
+		file_size = file_path.stat().st_size
+	except FileNotFoundError:
 		return ValidationResult(
 			filename=file_path.name,
 			is_valid=False,
@@ -84,14 +301,23 @@ def validate_geotiff(file_path: Path) -> Tuple[ValidationResult, Tuple[Optional[
 		), extracted_date
 	
 	# Check file size
-	file_size = file_path.stat().st_size
 	if file_size == 0:
 		return ValidationResult(
 			filename=file_path.name,
+			file_size=file_size,
 			is_valid=False,
 			errors=["File is empty"],
 		), extracted_date
 	
+	# Plain TIFFs without any GeoTIFF tags can be rejected from the header alone
+	if _lacks_georeferencing(file_path):
+		return ValidationResult(
+			filename=file_path.name,
+			file_size=file_size,
+			is_valid=False,
+			errors=[NO_GEOREFERENCING_ERROR],
+		), extracted_date
+	
 	# Try to open with rasterio for more validation
 	try:
 		import rasterio
@@ -109,11 +335,7 @@ def validate_geotiff(file_path: Path) -> Tuple[ValidationResult, Tuple[Optional[
 						"Please re-export with embedded CRS or include a .prj file."
 					)
 				else:
-					errors.append(
-						"File has no coordinate reference system (CRS) or georeferencing. "
-						"This appears to be a plain image, not a georeferenced orthomosaic. "
-						"Please upload a GeoTIFF with embedded CRS."
-					)
+					errors.append(NO_GEOREFERENCING_ERROR)
 			else:
 				# Check for invalid CRS types
 				crs_str = str(src.crs)
@@ -162,6 +384,7 @@ def validate_geotiff(file_path: Path) -> Tuple[ValidationResult, Tuple[Optional[
 	
 	return ValidationResult(
 		filename=file_path.name,
+		file_size=file_size,
 		is_valid=len(errors) == 0,
 		warnings=warnings,
 		errors=errors,
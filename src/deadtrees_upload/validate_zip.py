@@ -1,9 +1,15 @@
 """ZIP file validation for raw drone images."""
 
+import os
+import struct
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from functools import lru_cache
 from pathlib import Path
-from typing import Set, Tuple, Optional
+from typing import Dict, Set, Tuple, Optional
 import zipfile
-from datetime import datetime
+import zlib
+from datetime import date
 
 from .models import ValidationResult
 
@@ -12,58 +18,143 @@ from .models import ValidationResult
 IMAGE_EXTENSIONS: Set[str] = {".jpg", ".jpeg", ".png", ".tif", ".tiff", ".dng", ".raw", ".cr2", ".nef", ".arw"}
 JPEG_EXTENSIONS: Set[str] = {".jpg", ".jpeg"}
 
+# An empty archive is just its end-of-central-directory record; anything
+# shorter cannot be a ZIP and is rejected without opening it
+MIN_ZIP_SIZE = 22
 
-def extract_date_from_zip(file_path: Path) -> Tuple[Optional[int], Optional[int], Optional[int]]:
+# Number of (path, mtime, size) archive inspections kept in memory
+DATE_CACHE_SIZE = 1024
+
+# Leading JPEGs whose EXIF is read: all are checked for GPS, the first
+# DATE_SAMPLE_SIZE of them for an acquisition date
+GPS_SAMPLE_SIZE = 5
+DATE_SAMPLE_SIZE = 3
+
+# Most bytes of a JPEG member decompressed while looking for its EXIF segment
+EXIF_SCAN_LIMIT = 128 * 1024
+
+# EXIF tag ids: IFD pointers in IFD0, then tags inside the Exif and GPS IFDs
+EXIF_IFD_POINTER = 0x8769
+GPS_IFD_POINTER = 0x8825
+EXIF_DATETIME_ORIGINAL = 0x9003
+GPS_LATITUDE = 0x0002
+GPS_LONGITUDE = 0x0004
+
+# Size in bytes of one value of each EXIF field type
+_EXIF_TYPE_SIZES = {1: 1, 2: 1, 3: 2, 4: 4, 5: 8, 7: 1, 9: 4, 10: 8, 13: 4}
+
+# Raw EXIF block (a little TIFF file), its struct byte order and its IFD0
+ExifBlock = Tuple[bytes, str, Dict[int, bytes]]
+
+
+def _parse_exif_date(value: str) -> Optional[Tuple[int, int, int]]:
 	"""
-	Try to extract acquisition date from JPEG EXIF in a ZIP file.
+	Parse the date part of an EXIF datetime ("2024:07:01 10:00:00").
 	
-	Samples JPEG images in the ZIP and extracts DateTimeOriginal from EXIF.
+	The format is fixed-width, so the fields are sliced out directly; the
+	date constructor rejects placeholders like "0000:00:00".
+	"""
+	if len(value) < 10 or value[4] != ':' or value[7] != ':':
+		return None
+	try:
+		parsed = date(int(value[0:4]), int(value[5:7]), int(value[8:10]))
+	except ValueError:
+		return None
+	return parsed.year, parsed.month, parsed.day
+
+
+def _exif_ifd(tiff: bytes, byte_order: str, offset: int) -> Dict[int, bytes]:
+	"""
+	Read one image file directory of an EXIF block.
+	
+	Returns:
+		Dictionary of tag id to raw value bytes (empty for unknown field types)
+	"""
+	entry_count = struct.unpack_from(byte_order + 'H', tiff, offset)[0]
+	entries = {}
+	for index in range(entry_count):
+		position = offset + 2 + index * 12
+		tag, field_type, value_count = struct.unpack_from(byte_order + 'HHI', tiff, position)
+		size = value_count * _EXIF_TYPE_SIZES.get(field_type, 0)
+		# Values up to four bytes are stored inline instead of an offset
+		start = position + 8 if size <= 4 else struct.unpack_from(byte_order + 'I', tiff, position + 8)[0]
+		entries[tag] = tiff[start:start + size]
+	return entries
+
+
+def _exif_sub_ifd(exif: ExifBlock, pointer_tag: int) -> Dict[int, bytes]:
+	"""Follow an IFD0 pointer tag (Exif or GPS) to its directory; empty if absent."""
+	tiff, byte_order, ifd0 = exif
+	pointer = ifd0.get(pointer_tag)
+	if not pointer or len(pointer) != 4:
+		return {}
+	return _exif_ifd(tiff, byte_order, struct.unpack(byte_order + 'I', pointer)[0])
+
+
+def _read_member_exif(zf: zipfile.ZipFile, image_path: str) -> Optional[ExifBlock]:
+	"""
+	Read the EXIF block of a JPEG inside a ZIP without extracting the member.
+	
+	Walks the JPEG marker segments from the start of the member and stops
+	at the APP1 "Exif" segment, so only the leading segments are
+	decompressed, never the pixel data.
 	
 	Args:
-		file_path: Path to ZIP file
+		zf: Open ZipFile object
+		image_path: Path to image within ZIP
 	
 	Returns:
-		Tuple of (year, month, day) - any can be None if not found
+		(tiff bytes, byte order, IFD0 entries), or None if the image has no EXIF
+	
+	Raises:
+		struct.error: If the EXIF block is truncated
 	"""
-	try:
-		import io
-		from PIL import Image
-		from PIL.ExifTags import TAGS
+	with zf.open(image_path) as member:
+		if member.read(2) != b'\xff\xd8':
+			return None
 		
-		with zipfile.ZipFile(file_path, 'r') as zf:
-			# Find JPEG files
-			jpeg_files = [
-				f for f in zf.namelist()
-				if not f.startswith('__MACOSX') and not f.startswith('.')
-				and Path(f).suffix.lower() in JPEG_EXTENSIONS
-			]
-			
-			if not jpeg_files:
-				return None, None, None
-			
-			# Sample first few images
-			for img_path in jpeg_files[:3]:
-				try:
-					with zf.open(img_path) as img_file:
-						img = Image.open(io.BytesIO(img_file.read()))
-						exif = img._getexif()
-						
-						if exif:
-							for tag_id, value in exif.items():
-								tag = TAGS.get(tag_id, tag_id)
-								if tag == "DateTimeOriginal":
-									# Format: "2024:07:01 10:00:00"
-									try:
-										dt = datetime.strptime(str(value), "%Y:%m:%d %H:%M:%S")
-										return dt.year, dt.month, dt.day
-									except ValueError:
-										pass
-				except Exception:
-					continue
+		scanned = 2
+		while scanned < EXIF_SCAN_LIMIT:
+			header = member.read(4)
+			# Start of scan (0xDA) means compressed image data follows
+			if len(header) < 4 or header[0] != 0xFF or header[1] == 0xDA:
+				return None
+			length = struct.unpack('>H', header[2:])[0] - 2
+			# A length field below 2 is corrupt; read(-n) would decompress the rest
+			if length < 0:
+				return None
+			scanned += 4
+			segment = member.read(min(length, EXIF_SCAN_LIMIT - scanned))
+			scanned += length
 			
-			return None, None, None
-	except Exception:
-		return None, None, None
+			if header[1] == 0xE1 and segment.startswith(b'Exif\x00\x00'):
+				tiff = segment[6:]
+				byte_order = {b'II': '<', b'MM': '>'}.get(tiff[:2])
+				if byte_order is None:
+					return None
+				ifd0 = _exif_ifd(tiff, byte_order, struct.unpack_from(byte_order + 'I', tiff, 4)[0])
+				return tiff, byte_order, ifd0
+	
+	return None
+
+
+def _exif_has_gps(exif: Optional[ExifBlock]) -> bool:
+	"""Check whether an EXIF block's GPS IFD has both latitude and longitude."""
+	if exif is None:
+		return False
+	gps_info = _exif_sub_ifd(exif, GPS_IFD_POINTER)
+	return GPS_LATITUDE in gps_info and GPS_LONGITUDE in gps_info
+
+
+def _exif_date(exif: Optional[ExifBlock]) -> Optional[Tuple[int, int, int]]:
+	"""Get the DateTimeOriginal date of an EXIF block, if it has a valid one."""
+	if exif is None:
+		return None
+	value = (
+		_exif_sub_ifd(exif, EXIF_IFD_POINTER).get(EXIF_DATETIME_ORIGINAL)
+		or exif[2].get(EXIF_DATETIME_ORIGINAL)
+	)
+	return _parse_exif_date(value.decode('ascii', 'replace')) if value else None
 
 
 def check_image_has_gps(zf: zipfile.ZipFile, image_path: str) -> bool:
@@ -78,32 +169,141 @@ def check_image_has_gps(zf: zipfile.ZipFile, image_path: str) -> bool:
 		True if GPS coordinates found
 	"""
 	try:
-		import io
-		from PIL import Image
-		from PIL.ExifTags import TAGS, GPSTAGS
+		return _exif_has_gps(_read_member_exif(zf, image_path))
+	except Exception:
+		return False
+
+
+def _spot_check_zip(zf: zipfile.ZipFile) -> Optional[str]:
+	"""
+	Cheap alternative to testzip() for large archives.
+	
+	The central directory was already parsed when the ZipFile was opened;
+	reading a byte of the first and last member also checks that their local
+	headers are where the directory says.
+	
+	Returns:
+		Name of the first unreadable member, or None
+	"""
+	members = zf.infolist()
+	for info in members[:1] + members[-1:]:
+		try:
+			with zf.open(info) as member:
+				member.read(1)
+		except (zipfile.BadZipFile, zlib.error, EOFError):
+			return info.filename
+	return None
+
+
+@dataclass(frozen=True)
+class ZipContents:
+	"""Everything validation and date extraction read from one pass over an archive."""
+	member_count: int
+	image_count: int
+	nested_zips: Tuple[str, ...]
+	bad_member: Optional[str]  # First member failing the spot check
+	sample_gps: Tuple[bool, ...]  # GPS presence for the first GPS_SAMPLE_SIZE JPEGs
+	date: Tuple[Optional[int], Optional[int], Optional[int]]
+
+
+@lru_cache(maxsize=DATE_CACHE_SIZE)
+def _inspect_zip(path: str, mtime_ns: int, size: int) -> ZipContents:
+	"""
+	Open an archive once and collect what validate_zip and extract_date_from_zip need.
+	
+	mtime_ns and size only key the cache, so an archive that is both
+	validated and scanned for dates is opened and sampled once.
+	
+	Raises:
+		zipfile.BadZipFile: If the central directory cannot be read
+	"""
+	with zipfile.ZipFile(path, 'r') as zf:
+		bad_member = _spot_check_zip(zf)
+		file_list = zf.namelist()
 		
-		with zf.open(image_path) as img_file:
-			img = Image.open(io.BytesIO(img_file.read()))
-			exif = img._getexif()
+		# Classify members in one pass
+		image_files = []
+		jpeg_images = []
+		nested_zips = []
+		for name in file_list:
+			# Skip directories and hidden files
+			if name.endswith('/') or name.startswith(('__MACOSX', '.')):
+				continue
 			
-			if exif:
-				for tag_id, value in exif.items():
-					tag = TAGS.get(tag_id, tag_id)
-					if tag == "GPSInfo":
-						# Check if GPS has actual coordinates
-						gps_data = {}
-						for gps_tag_id in value:
-							gps_tag = GPSTAGS.get(gps_tag_id, gps_tag_id)
-							gps_data[gps_tag] = value[gps_tag_id]
-						
-						if "GPSLatitude" in gps_data and "GPSLongitude" in gps_data:
-							return True
+			suffix = os.path.splitext(name)[1].lower()
+			if suffix in IMAGE_EXTENSIONS:
+				image_files.append(name)
+				if suffix in JPEG_EXTENSIONS:
+					jpeg_images.append(name)
+			elif suffix == '.zip':
+				nested_zips.append(name)
+		
+		def read_exif(name: str) -> Optional[ExifBlock]:
+			try:
+				return _read_member_exif(zf, name)
+			except Exception:
+				return None
+		
+		# ZipFile serialises access to the shared handle, so members can
+		# be read and decoded from several threads at once
+		sample = jpeg_images[:GPS_SAMPLE_SIZE] if bad_member is None else []
+		exif_blocks = []
+		if sample:
+			with ThreadPoolExecutor(max_workers=len(sample)) as executor:
+				exif_blocks = list(executor.map(read_exif, sample))
+	
+	# A corrupt Exif or GPS IFD only means that image has no usable date/GPS
+	def exif_date(exif: Optional[ExifBlock]) -> Optional[Tuple[int, int, int]]:
+		try:
+			return _exif_date(exif)
+		except Exception:
+			return None
+	
+	def has_gps(exif: Optional[ExifBlock]) -> bool:
+		try:
+			return _exif_has_gps(exif)
+		except Exception:
 			return False
+	
+	date_found = next(filter(None, map(exif_date, exif_blocks[:DATE_SAMPLE_SIZE])), None)
+	
+	return ZipContents(
+		member_count=len(file_list),
+		image_count=len(image_files),
+		nested_zips=tuple(nested_zips),
+		bad_member=bad_member,
+		sample_gps=tuple(map(has_gps, exif_blocks)),
+		date=date_found or (None, None, None),
+	)
+
+
+def _inspect_zip_file(file_path: Path, stat: os.stat_result) -> ZipContents:
+	"""Look up the cached inspection for the current version of file_path."""
+	return _inspect_zip(str(file_path.resolve()), stat.st_mtime_ns, stat.st_size)
+
+
+def extract_date_from_zip(file_path: Path) -> Tuple[Optional[int], Optional[int], Optional[int]]:
+	"""
+	Try to extract acquisition date from JPEG EXIF in a ZIP file.
+	
+	Samples JPEG images in the ZIP and extracts DateTimeOriginal from EXIF.
+	
+	Lookups are cached until the archive's mtime or size changes, and are
+	shared with validate_zip.
+	
+	Args:
+		file_path: Path to ZIP file
+	
+	Returns:
+		Tuple of (year, month, day) - any can be None if not found
+	"""
+	try:
+		return _inspect_zip_file(file_path, file_path.stat()).date
 	except Exception:
-		return False
+		return None, None, None
 
 
-def validate_zip(file_path: Path) -> ValidationResult:
+def validate_zip(file_path: Path, deep_check: bool = False) -> ValidationResult:
 	"""
 	Validate a ZIP file containing raw drone images.
 	
@@ -116,6 +316,8 @@ def validate_zip(file_path: Path) -> ValidationResult:
 	
 	Args:
 		file_path: Path to ZIP file
+		deep_check: Decompress every member to verify CRCs; otherwise only the
+			central directory and the first/last local headers are checked
 	
 	Returns:
 		ValidationResult with any warnings/errors
@@ -123,94 +325,84 @@ def validate_zip(file_path: Path) -> ValidationResult:
 	warnings = []
 	errors = []
 	
-	if not file_path.exists():
+	# A single stat both checks existence and gives the size
+	try:
+		stat = file_path.stat()
+	except FileNotFoundError:
 		return ValidationResult(
 			filename=file_path.name,
 			is_valid=False,
 			errors=["File does not exist"],
 		)
+	file_size = stat.st_size
 	
 	# Check file size
-	file_size = file_path.stat().st_size
 	if file_size == 0:
 		return ValidationResult(
 			filename=file_path.name,
+			file_size=file_size,
 			is_valid=False,
 			errors=["File is empty"],
 		)
+	if file_size < MIN_ZIP_SIZE:
+		return ValidationResult(
+			filename=file_path.name,
+			file_size=file_size,
+			is_valid=False,
+			errors=["Invalid or corrupted ZIP file"],
+		)
 	
 	try:
-		with zipfile.ZipFile(file_path, 'r') as zf:
-			# Check if ZIP is valid
-			bad_file = zf.testzip()
-			if bad_file:
-				errors.append(f"Corrupted file in ZIP: {bad_file}")
-				return ValidationResult(
-					filename=file_path.name,
-					is_valid=False,
-					errors=errors,
-				)
-			
-			# Get list of files
-			file_list = zf.namelist()
+		contents = _inspect_zip_file(file_path, stat)
+		
+		# Check if ZIP is valid
+		bad_file = contents.bad_member
+		if deep_check and bad_file is None:
+			with zipfile.ZipFile(file_path, 'r') as zf:
+				bad_file = zf.testzip()
+		if bad_file:
+			errors.append(f"Corrupted file in ZIP: {bad_file}")
+			return ValidationResult(
+				filename=file_path.name,
+				file_size=file_size,
+				is_valid=False,
+				errors=errors,
+			)
+		
+		if not contents.member_count:
+			errors.append("ZIP file is empty")
+			return ValidationResult(
+				filename=file_path.name,
+				file_size=file_size,
+				is_valid=False,
+				errors=errors,
+			)
+		
+		image_count = contents.image_count
+		if image_count == 0:
+			errors.append("No image files found in ZIP")
+		elif image_count < 3:
+			warnings.append(f"Only {image_count} images found - ODM typically needs at least 3 for reconstruction")
+		elif contents.sample_gps:
+			# GPS is critical for ODM to work efficiently
+			sample_size = len(contents.sample_gps)
+			gps_count = sum(contents.sample_gps)
 			
-			if not file_list:
-				errors.append("ZIP file is empty")
-				return ValidationResult(
-					filename=file_path.name,
-					is_valid=False,
-					errors=errors,
+			if gps_count == 0:
+				warnings.append(
+					"No GPS coordinates found in sample images. "
+					"Without GPS data, ODM processing may fail or take extremely long (hours to days). "
+					"Consider using images with embedded GPS coordinates."
 				)
-			
-			# Filter to image files only
-			image_files = []
-			for name in file_list:
-				# Skip directories and hidden files
-				if name.endswith('/') or name.startswith('__MACOSX') or name.startswith('.'):
-					continue
-				
-				suffix = Path(name).suffix.lower()
-				if suffix in IMAGE_EXTENSIONS:
-					image_files.append(name)
-			
-			if len(image_files) == 0:
-				errors.append("No image files found in ZIP")
-			elif len(image_files) < 3:
-				warnings.append(f"Only {len(image_files)} images found - ODM typically needs at least 3 for reconstruction")
-			else:
-				# Check GPS coordinates in a sample of JPEG images
-				# GPS is critical for ODM to work efficiently
-				jpeg_images = [f for f in image_files if Path(f).suffix.lower() in {'.jpg', '.jpeg'}]
-				
-				if jpeg_images:
-					sample_size = min(5, len(jpeg_images))
-					sample_images = jpeg_images[:sample_size]
-					gps_count = 0
-					
-					try:
-						for img_path in sample_images:
-							if check_image_has_gps(zf, img_path):
-								gps_count += 1
-						
-						if gps_count == 0:
-							warnings.append(
-								"No GPS coordinates found in sample images. "
-								"Without GPS data, ODM processing may fail or take extremely long (hours to days). "
-								"Consider using images with embedded GPS coordinates."
-							)
-						elif gps_count < sample_size:
-							warnings.append(
-								f"Only {gps_count}/{sample_size} sample images have GPS coordinates. "
-								"Missing GPS data may affect processing quality."
-							)
-					except ImportError:
-						# PIL not available, skip GPS check
-						pass
-			
-			# Check for nested ZIPs
-			nested_zips = [n for n in file_list if n.lower().endswith('.zip')]
-			if nested_zips:
-				warnings.append(f"Nested ZIP files found: {', '.join(nested_zips[:3])}")
+			elif gps_count < sample_size:
+				warnings.append(
+					f"Only {gps_count}/{sample_size} sample images have GPS coordinates. "
+					"Missing GPS data may affect processing quality."
+				)
+		
+		# Check for nested ZIPs
+		if contents.nested_zips:
+			warnings.append(f"Nested ZIP files found: {', '.join(contents.nested_zips[:3])}")
 	
 	except zipfile.BadZipFile:
 		errors.append("Invalid or corrupted ZIP file")
@@ -219,6 +411,7 @@ def validate_zip(file_path: Path) -> ValidationResult:
 	
 	return ValidationResult(
 		filename=file_path.name,
+		file_size=file_size,
 		is_valid=len(errors) == 0,
 		warnings=warnings,
 		errors=errors,
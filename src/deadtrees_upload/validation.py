@@ -1,7 +1,10 @@
 """File and metadata validation."""
 
+import os
+import stat
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-from typing import List, Dict, Tuple, Optional
+from typing import Callable, List, Dict, Tuple, Optional
 
 from .models import FileMetadata, ValidationResult, UploadType
 from .validate_geotiff import validate_geotiff
@@ -18,20 +21,33 @@ GEOTIFF_EXTENSIONS = {".tif", ".tiff", ".geotiff"}
 ZIP_EXTENSIONS = {".zip"}
 ALL_UPLOADABLE_EXTENSIONS = GEOTIFF_EXTENSIONS | ZIP_EXTENSIONS
 
+# Maximum number of files validated concurrently
+VALIDATION_WORKERS = min(16, (os.cpu_count() or 1) * 2)
+
+DateTuple = Tuple[Optional[int], Optional[int], Optional[int]]
+
+
+def _validate_zip_file(file_path: Path) -> Tuple[ValidationResult, DateTuple]:
+	"""Validate a ZIP; dates are not taken from raw image archives here."""
+	return validate_zip(file_path), (None, None, None)
+
+
+# Lowercase extension -> (file type label, upload type, validator)
+_EXTENSION_DISPATCH: Dict[str, Tuple[str, UploadType, Callable[[Path], Tuple[ValidationResult, DateTuple]]]] = {
+	**{ext: ("GeoTIFF", UploadType.geotiff, validate_geotiff) for ext in GEOTIFF_EXTENSIONS},
+	**{ext: ("ZIP", UploadType.raw_images_zip, _validate_zip_file) for ext in ZIP_EXTENSIONS},
+}
+
 
 def is_uploadable_file(path: Path) -> bool:
 	"""Check if a path is a valid uploadable file (GeoTIFF or ZIP)."""
-	return path.is_file() and path.suffix.lower() in ALL_UPLOADABLE_EXTENSIONS
+	return path.suffix.lower() in _EXTENSION_DISPATCH and path.is_file()
 
 
 def get_file_type(path: Path) -> Optional[str]:
 	"""Get the file type string for an uploadable file."""
-	suffix = path.suffix.lower()
-	if suffix in GEOTIFF_EXTENSIONS:
-		return "GeoTIFF"
-	elif suffix in ZIP_EXTENSIONS:
-		return "ZIP"
-	return None
+	entry = _EXTENSION_DISPATCH.get(path.suffix.lower())
+	return entry[0] if entry else None
 
 
 def find_uploadable_files(path: Path) -> Tuple[List[Path], Dict[str, str]]:
@@ -51,14 +67,18 @@ def find_uploadable_files(path: Path) -> Tuple[List[Path], Dict[str, str]]:
 	files = []
 	file_types = {}
 	
-	if not path.exists():
+	# One stat answers exists / is_file / is_dir
+	try:
+		mode = path.stat().st_mode
+	except FileNotFoundError:
 		raise ValidationError(f"Path does not exist: {path}")
 	
 	# Handle single file
-	if path.is_file():
-		if is_uploadable_file(path):
+	if stat.S_ISREG(mode):
+		file_type = get_file_type(path)
+		if file_type:
 			files.append(path)
-			file_types[path.name] = get_file_type(path)
+			file_types[path.name] = file_type
 		else:
 			raise ValidationError(
 				f"File type not supported: {path.suffix}. "
@@ -67,17 +87,18 @@ def find_uploadable_files(path: Path) -> Tuple[List[Path], Dict[str, str]]:
 		return files, file_types
 	
 	# Handle directory
-	if not path.is_dir():
+	if not stat.S_ISDIR(mode):
 		raise ValidationError(f"Path is not a file or directory: {path}")
 	
-	for file_path in path.iterdir():
-		if not file_path.is_file():
-			continue
-		
-		file_type = get_file_type(file_path)
-		if file_type:
-			files.append(file_path)
-			file_types[file_path.name] = file_type
+	# scandir entries carry the file type from the directory listing, so only
+	# candidates with an uploadable suffix may need an extra stat; Path
+	# objects are only built for matches
+	with os.scandir(path) as entries:
+		for entry in entries:
+			dispatch = _EXTENSION_DISPATCH.get(os.path.splitext(entry.name)[1].lower())
+			if dispatch and entry.is_file():
+				files.append(Path(entry.path))
+				file_types[entry.name] = dispatch[0]
 	
 	return files, file_types
 
@@ -93,16 +114,13 @@ def detect_upload_type(file_path: Path) -> UploadType:
 		UploadType enum value
 	"""
 	suffix = file_path.suffix.lower()
-	
-	if suffix in GEOTIFF_EXTENSIONS:
-		return UploadType.geotiff
-	elif suffix in ZIP_EXTENSIONS:
-		return UploadType.raw_images_zip
-	else:
+	entry = _EXTENSION_DISPATCH.get(suffix)
+	if entry is None:
 		raise ValidationError(f"Unsupported file type: {suffix}")
+	return entry[1]
 
 
-def validate_file(file_path: Path) -> Tuple[ValidationResult, Tuple[Optional[int], Optional[int], Optional[int]]]:
+def validate_file(file_path: Path) -> Tuple[ValidationResult, DateTuple]:
 	"""
 	Validate a file based on its type.
 	
@@ -113,17 +131,14 @@ def validate_file(file_path: Path) -> Tuple[ValidationResult, Tuple[Optional[int
 		Tuple of (ValidationResult, extracted_date)
 	"""
 	suffix = file_path.suffix.lower()
-	
-	if suffix in GEOTIFF_EXTENSIONS:
-		return validate_geotiff(file_path)
-	elif suffix in ZIP_EXTENSIONS:
-		return validate_zip(file_path), (None, None, None)
-	else:
+	entry = _EXTENSION_DISPATCH.get(suffix)
+	if entry is None:
 		return ValidationResult(
 			filename=file_path.name,
 			is_valid=False,
 			errors=[f"Unsupported file type: {suffix}"],
 		), (None, None, None)
+	return entry[2](file_path)
 
 
 def match_files_to_metadata(
@@ -140,28 +155,25 @@ def match_files_to_metadata(
 	Returns:
 		Tuple of (matched metadata with file_path set, unmatched files, unmatched metadata)
 	"""
-	# Create lookup by filename
-	file_lookup: Dict[str, Path] = {f.name.lower(): f for f in files}
+	# Create lookup by filename; matched files are popped from it, so
+	# whatever is left over at the end has no metadata
+	remaining_files: Dict[str, Path] = {f.name.lower(): f for f in files}
 	metadata_lookup: Dict[str, FileMetadata] = {m.filename.lower(): m for m in metadata_list}
 	
 	matched = []
-	unmatched_files = []
 	unmatched_metadata = []
 	
-	# Match metadata to files
 	for filename_lower, metadata in metadata_lookup.items():
-		if filename_lower in file_lookup:
-			metadata.file_path = file_lookup[filename_lower]
-			metadata.upload_type = detect_upload_type(metadata.file_path)
+		file_path = remaining_files.pop(filename_lower, None)
+		if file_path is not None:
+			metadata.file_path = file_path
+			metadata.upload_type = detect_upload_type(file_path)
 			matched.append(metadata)
 		else:
 			unmatched_metadata.append(metadata.filename)
 	
 	# Find files without metadata
-	matched_filenames = {m.filename.lower() for m in matched}
-	for file_path in files:
-		if file_path.name.lower() not in matched_filenames:
-			unmatched_files.append(file_path.name)
+	unmatched_files = [file_path.name for file_path in remaining_files.values()]
 	
 	return matched, unmatched_files, unmatched_metadata
 
@@ -178,6 +190,16 @@ def validate_all(
 	Returns:
 		List of ValidationResult
 	"""
+	to_validate = [m for m in matched_metadata if m.file_path is not None]
+	validated = {}
+	
+	# Files are independent and validation is mostly header I/O (rasterio and
+	# zipfile release the GIL), so they are checked concurrently
+	if to_validate:
+		with ThreadPoolExecutor(max_workers=min(VALIDATION_WORKERS, len(to_validate))) as executor:
+			outcomes = executor.map(validate_file, [m.file_path for m in to_validate])
+			validated = {id(m): outcome for m, outcome in zip(to_validate, outcomes)}
+	
 	results = []
 	
 	for metadata in matched_metadata:
@@ -189,7 +211,7 @@ def validate_all(
 			))
 			continue
 		
-		result, extracted_date = validate_file(metadata.file_path)
+		result, extracted_date = validated[id(metadata)]
 		
 		# Apply extracted date to metadata if not already set
 		year, month, day = extracted_date
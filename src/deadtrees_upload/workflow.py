@@ -1,18 +1,27 @@
 """Workflow logic for validation and upload."""
 
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-from typing import Optional, List
+from typing import Dict, Optional, List
 
 import typer
 from rich.console import Console
-from rich.progress import Progress, SpinnerColumn, TextColumn, BarColumn, TaskProgressColumn, TimeRemainingColumn
 
 from .models import FileMetadata, ValidationResult, UploadResult
 from .auth import AuthSession
 from .metadata import parse_metadata
 from .validation import find_uploadable_files, match_files_to_metadata, validate_all
-from .upload import upload_file, format_size, trigger_processing
-from .dedup import UploadSessionState, get_session_file_path, get_file_identifier
+from .upload import upload_file, create_upload_client, format_size, trigger_processing
+from .dedup import (
+	UploadSessionState,
+	get_session_file_path,
+	get_hash_cache_key,
+	get_hash_cache_path,
+	load_hash_cache,
+	save_hash_cache,
+	calculate_file_hashes,
+	get_file_identifier,
+)
 from .display import (
 	print_step,
 	show_validation_table,
@@ -26,6 +35,12 @@ from .prompts import confirm_upload
 
 console = Console()
 
+# Processing trigger requests in flight while later files upload
+PROCESSING_TRIGGER_WORKERS = 4
+
+# Number of increments a file-count progress bar is redrawn in
+PROGRESS_UPDATE_STEPS = 100
+
 
 def validate_and_match(
 	data_dir: Path,
@@ -75,11 +90,31 @@ def validate_and_match(
 def calculate_hashes_with_progress(
 	validation_results: List[ValidationResult],
 	session: UploadSessionState,
-) -> None:
-	"""Calculate file hashes and update session state."""
+	data_dir: Optional[Path] = None,
+) -> Dict[str, str]:
+	"""
+	Calculate file hashes, reusing hashes cached in the session state and,
+	if data_dir is given, in the directory's persistent hash cache.
+	
+	Files whose size and first bytes match no other file in the batch can't
+	be duplicates, so they are left out instead of being read in full.
+	
+	Returns:
+		Dict of filename -> hash for the files that were hashed
+	"""
+	from rich.progress import Progress, SpinnerColumn, TextColumn, BarColumn, TaskProgressColumn
+	
 	console.print()
 	console.print("[bold]Calculating file hashes for duplicate detection...[/bold]")
 	
+	files = {
+		result.metadata.file_path: result.metadata.filename
+		for result in validation_results
+		if result.metadata and result.metadata.file_path
+	}
+	file_hashes = {}
+	hash_errors = []
+	
 	with Progress(
 		SpinnerColumn(),
 		TextColumn("[progress.description]{task.description}"),
@@ -87,20 +122,55 @@ def calculate_hashes_with_progress(
 		TaskProgressColumn(),
 		console=console,
 	) as progress:
-		task = progress.add_task("Hashing files", total=len(validation_results))
+		task = progress.add_task("Hashing files", total=len(files))
+		
+		# Cached files report back in a tight loop; push the count to the
+		# display roughly once per percent rather than once per file
+		update_every = max(1, len(files) // PROGRESS_UPDATE_STEPS)
+		done = 0
+		unique = 0
 		
-		for result in validation_results:
-			if result.metadata and result.metadata.file_path:
-				filename = result.metadata.filename
-				if filename not in session.file_hashes:
-					try:
-						file_hash = get_file_identifier(result.metadata.file_path)
-						session.file_hashes[filename] = file_hash
-					except Exception as e:
-						console.print(f"[yellow]![/yellow] Could not hash {filename}: {e}")
-			progress.advance(task)
-	
-	console.print(f"[green]✓[/green] Calculated {len(session.file_hashes)} file hashes")
+		def on_file_hashed(file_path: Path, file_hash: Optional[str], error: Optional[Exception]) -> None:
+			nonlocal done, unique
+			if file_hash:
+				file_hashes[files[file_path]] = file_hash
+			elif error:
+				hash_errors.append(f"[yellow]![/yellow] Could not hash {files[file_path]}: {error}")
+			else:
+				unique += 1
+			done += 1
+			if done % update_every == 0:
+				progress.update(task, completed=done)
+		
+		cache_path = get_hash_cache_path(data_dir) if data_dir else None
+		cached_hashes = load_hash_cache(cache_path) if cache_path else {}
+		cached_hashes.update(session.file_hashes)
+		
+		new_hashes = calculate_file_hashes(
+			list(files),
+			existing_hashes=cached_hashes,
+			on_file_hashed=on_file_hashed,
+			skip_unique=True,
+		)
+		progress.update(task, completed=done)
+	
+	session.file_hashes.update(new_hashes)
+	
+	if cache_path and not new_hashes.keys() <= cached_hashes.keys():
+		cached_hashes.update(new_hashes)
+		try:
+			save_hash_cache(cache_path, cached_hashes)
+		except OSError:
+			pass  # The cache is an optimisation; a read-only directory is fine
+	
+	# Unreadable files tend to come in bunches (e.g. a dropped network
+	# mount); report them in one write once the progress bar is gone
+	if hash_errors:
+		console.print("\n".join(hash_errors))
+	console.print(f"[green]✓[/green] Calculated {len(file_hashes)} file hashes")
+	if unique:
+		console.print(f"[dim]{unique} files with unique size and header skipped[/dim]")
+	return file_hashes
 
 
 def do_upload(
@@ -133,30 +203,39 @@ def do_upload(
 		session.files_total = len(valid_results)
 		
 		# Calculate hashes for duplicate detection
-		calculate_hashes_with_progress(valid_results, session)
+		file_hashes = calculate_hashes_with_progress(valid_results, session, data_dir)
 		
-		# Check for already-completed files (from previous session)
-		already_done = [r for r in valid_results if r.metadata.filename in session.files_completed]
-		if already_done:
-			console.print(f"[dim]Skipping {len(already_done)} already-uploaded files[/dim]")
-			valid_results = [r for r in valid_results if r.metadata.filename not in session.files_completed]
+		# Persist hashes right away so a crashed run doesn't re-read every file
+		if data_dir:
+			try:
+				session.save(get_session_file_path(data_dir))
+			except Exception:
+				pass
 		
-		# Check for local duplicates (same hash in this batch)
+		# Drop files completed in a previous session and local duplicates
+		# (same hash in this batch) in one pass
+		pending_results = []
+		already_done = 0
 		seen_hashes = {}
 		duplicates = []
 		for result in valid_results:
 			filename = result.metadata.filename
-			file_hash = session.file_hashes.get(filename)
+			if filename in session.files_completed:
+				already_done += 1
+				continue
+			file_hash = file_hashes.get(filename)
 			if file_hash:
-				if file_hash in seen_hashes:
-					duplicates.append((filename, seen_hashes[file_hash]))
-					session.mark_skipped(filename, f"Duplicate of {seen_hashes[file_hash]}")
-				else:
-					seen_hashes[file_hash] = filename
+				original = seen_hashes.setdefault(file_hash, filename)
+				if original != filename:
+					duplicates.append((filename, original))
+					session.mark_skipped(filename, f"Duplicate of {original}")
+					continue
+			pending_results.append(result)
 		
+		if already_done:
+			console.print(f"[dim]Skipping {already_done} already-uploaded files[/dim]")
 		show_duplicates(duplicates)
-		if duplicates:
-			valid_results = [r for r in valid_results if r.metadata.filename not in session.files_skipped]
+		valid_results = pending_results
 	
 	if not valid_results:
 		console.print("[green]✓[/green] All files already uploaded or skipped")
@@ -164,86 +243,42 @@ def do_upload(
 	
 	if dry_run:
 		console.print("[yellow]DRY RUN[/yellow] - No files will be uploaded")
-		console.print(f"Would upload {len(valid_results)} files:")
-		for result in valid_results:
-			console.print(f"  • {result.filename}")
+		console.print("\n".join([
+			f"Would upload {len(valid_results)} files:",
+			*(f"  • {result.filename}" for result in valid_results),
+		]))
 		return []
 	
 	# Confirm upload
-	total_size = sum(
-		r.metadata.file_path.stat().st_size
-		for r in valid_results
-		if r.metadata and r.metadata.file_path
-	)
+	total_size = sum(r.file_size or 0 for r in valid_results)
 	
 	if not confirm_upload(len(valid_results), format_size(total_size)):
 		raise typer.Exit(0)
 	
+	from rich.progress import Progress, SpinnerColumn, TextColumn, BarColumn, TaskProgressColumn, TimeRemainingColumn
+	
 	console.print()
 	
 	# Upload files sequentially with progress
 	upload_results = []
+	uploaded_hashes = {}  # cache key -> hash for uploads the hashing step skipped
 	
-	with Progress(
-		SpinnerColumn(),
-		TextColumn("[progress.description]{task.description}"),
-		BarColumn(),
-		TaskProgressColumn(),
-		TimeRemainingColumn(),
-		console=console,
-	) as progress:
-		# Overall progress
-		overall_task = progress.add_task(
-			f"[bold]Uploading {len(valid_results)} files...[/bold]",
-			total=len(valid_results),
-		)
-		
-		for result in valid_results:
-			metadata = result.metadata
-			file_size = metadata.file_path.stat().st_size if metadata.file_path else 0
-			
-			# File-specific progress
-			file_task = progress.add_task(
-				f"  {metadata.filename[:30]}...",
-				total=file_size,
-			)
-			
-			# Upload with token refresh support
-			upload_result = upload_file(
-				metadata=metadata,
-				token=token,  # AuthSession handles refresh
-				api_url=api_url,
-				progress=progress,
-				task_id=file_task,
-			)
-			
-			upload_results.append(upload_result)
-			
-			# Update session state
-			if session:
-				if upload_result.success:
-					session.mark_completed(metadata.filename, upload_result.dataset_id)
-				else:
-					session.mark_failed(metadata.filename, upload_result.error or "Unknown error")
-				
-				# Save session after each file (for resume on crash)
-				if data_dir:
-					try:
-						session.save(get_session_file_path(data_dir))
-					except Exception:
-						pass  # Don't fail upload if session save fails
-			
-			# Update overall progress
-			progress.update(overall_task, advance=1)
-			
-			# Mark file task complete
-			progress.update(file_task, completed=file_size)
-			
-			# Log result and trigger processing
-			if upload_result.success:
-				# Trigger processing pipeline
+	try:
+		# One client for all files so the connection pool is reused between them.
+		# Processing triggers run in the background while the next file uploads;
+		# the executor is closed (waiting for them) before the progress display
+		with create_upload_client() as upload_client, Progress(
+			SpinnerColumn(),
+			TextColumn("[progress.description]{task.description}"),
+			BarColumn(),
+			TaskProgressColumn(),
+			TimeRemainingColumn(),
+			console=console,
+		) as progress, ThreadPoolExecutor(max_workers=PROCESSING_TRIGGER_WORKERS) as trigger_executor:
+			def trigger_and_report(metadata: FileMetadata, dataset_id: int) -> None:
+				"""Trigger processing for an uploaded dataset and log the outcome."""
 				processing_ok = trigger_processing(
-					dataset_id=upload_result.dataset_id,
+					dataset_id=dataset_id,
 					upload_type=metadata.upload_type,
 					token=token,
 					api_url=api_url,
@@ -251,15 +286,110 @@ def do_upload(
 				
 				if processing_ok:
 					progress.console.print(
-						f"  [green]✓[/green] {metadata.filename} → Dataset ID: {upload_result.dataset_id} [dim](processing started)[/dim]"
+						f"  [green]✓[/green] {metadata.filename} → Dataset ID: {dataset_id} [dim](processing started)[/dim]"
 					)
 				else:
 					progress.console.print(
-						f"  [yellow]⚠[/yellow] {metadata.filename} → Dataset ID: {upload_result.dataset_id} [dim](upload ok, processing failed to start)[/dim]"
+						f"  [yellow]⚠[/yellow] {metadata.filename} → Dataset ID: {dataset_id} [dim](upload ok, processing failed to start)[/dim]"
 					)
-			else:
-				progress.console.print(
-					f"  [red]✗[/red] {metadata.filename}: {upload_result.error}"
+			
+			# (metadata, dataset_id, future) for every processing trigger submitted
+			trigger_futures = []
+			
+			# Overall progress
+			overall_task = progress.add_task(
+				f"[bold]Uploading {len(valid_results)} files...[/bold]",
+				total=len(valid_results),
+			)
+			
+			for result in valid_results:
+				metadata = result.metadata
+				file_size = result.file_size or 0
+				
+				# File-specific progress
+				file_task = progress.add_task(
+					f"  {metadata.filename[:30]}...",
+					total=file_size,
+				)
+				
+				# Upload with token refresh support
+				upload_result = upload_file(
+					metadata=metadata,
+					token=token,  # AuthSession handles refresh
+					api_url=api_url,
+					progress=progress,
+					task_id=file_task,
+					client=upload_client,
 				)
+				
+				upload_results.append(upload_result)
+				
+				# Update session state
+				if session:
+					if upload_result.success:
+						session.mark_completed(metadata.filename, upload_result.dataset_id)
+						# Files the quick duplicate check ruled out were never fully
+						# hashed; keep a hash of every uploaded file for later runs
+						try:
+							key = get_hash_cache_key(metadata.file_path)
+							if key not in session.file_hashes:
+								uploaded_hashes[key] = session.file_hashes[key] = get_file_identifier(metadata.file_path)
+						except OSError:
+							pass
+					else:
+						session.mark_failed(metadata.filename, upload_result.error or "Unknown error")
+					
+					# Save session periodically (for resume on crash); failures
+					# are written right away so a retry run sees them
+					if data_dir:
+						try:
+							if upload_result.success:
+								session.save_if_due(get_session_file_path(data_dir))
+							else:
+								session.save(get_session_file_path(data_dir))
+						except Exception:
+							pass  # Don't fail upload if session save fails
+				
+				# Update overall progress
+				progress.update(overall_task, advance=1)
+				
+				# Mark file task complete
+				progress.update(file_task, completed=file_size)
+				
+				# Log result and trigger processing
+				if upload_result.success:
+					# Trigger processing pipeline (logged once the request returns)
+					trigger_futures.append((
+						metadata,
+						upload_result.dataset_id,
+						trigger_executor.submit(trigger_and_report, metadata, upload_result.dataset_id),
+					))
+				else:
+					progress.console.print(
+						f"  [red]✗[/red] {metadata.filename}: {upload_result.error}"
+					)
+			
+			# Wait for the triggers so an exception still gets its dataset a status line
+			for metadata, dataset_id, future in trigger_futures:
+				try:
+					future.result()
+				except Exception as e:
+					progress.console.print(
+						f"  [yellow]⚠[/yellow] {metadata.filename} → Dataset ID: {dataset_id} [dim](upload ok, processing failed to start: {e})[/dim]"
+					)
+	finally:
+		# Flush any results not yet covered by a periodic save, also when
+		# the run is interrupted
+		if session and data_dir:
+			try:
+				session.save(get_session_file_path(data_dir))
+			except Exception:
+				pass
+			if uploaded_hashes:
+				cache_path = get_hash_cache_path(data_dir)
+				try:
+					save_hash_cache(cache_path, {**load_hash_cache(cache_path), **uploaded_hashes})
+				except OSError:
+					pass
 	
 	return upload_results
@@ -5,16 +5,50 @@ This is the main consolidated test file. All tests are organized by module.
 
 import pytest
 from pathlib import Path
-import tempfile
 import json
 import time
 import zipfile
-import pandas as pd
 
 # Get fixtures directory
 FIXTURES_DIR = Path(__file__).parent / "fixtures"
 
 
+@pytest.fixture
+def make_auth_session():
+	"""Factory for AuthSessions expiring `expires_in` seconds from now."""
+	from deadtrees_upload.auth import AuthSession
+	
+	now = time.time()
+	
+	def make(expires_in: float = 3600, access_token: str = "token") -> AuthSession:
+		return AuthSession(
+			access_token=access_token,
+			refresh_token="refresh",
+			user_id="user123",
+			expires_at=now + expires_in,
+			supabase_url="http://supabase",
+			supabase_key="key",
+		)
+	
+	return make
+
+
+@pytest.fixture
+def auth_cache_dir(tmp_path, monkeypatch):
+	"""Point the auth session cache at a per-test directory."""
+	monkeypatch.setenv("DEADTREES_UPLOAD_CACHE_DIR", str(tmp_path))
+	return tmp_path
+
+
+@pytest.fixture(scope="module")
+def uploadable_tree(tmp_path_factory):
+	"""Read-only directory of empty GeoTIFF, ZIP and text files shared by discovery tests."""
+	tree = tmp_path_factory.mktemp("uploadable")
+	for name in ("test1.tif", "test2.tiff", "images.zip", "data.zip", "notes.txt"):
+		(tree / name).touch()
+	return tree
+
+
 # =============================================================================
 # FIXTURES
 # =============================================================================
@@ -107,7 +141,7 @@ class TestModels:
 	def test_license_normalization(self):
 		from deadtrees_upload.models import FileMetadata, LicenseEnum, PlatformEnum
 		
-		for license_str in ["CC BY", "cc by", "CC-BY", "CCBY"]:
+		for license_str in ["CC BY", "cc by", "CC-BY", "CCBY", "cc_by"]:
 			metadata = FileMetadata(
 				filename="test.tif",
 				license=license_str,
@@ -190,12 +224,12 @@ class TestMetadata:
 	def test_find_column_mapping_exact_match(self):
 		from deadtrees_upload.metadata import find_column_mapping
 		
-		df = pd.DataFrame({
+		df = {
 			"filename": ["test.tif"],
 			"license": ["CC BY"],
 			"platform": ["drone"],
 			"authors": ["John Smith"],
-		})
+		}
 		
 		mapping, missing = find_column_mapping(df)
 		
@@ -208,12 +242,12 @@ class TestMetadata:
 	def test_find_column_mapping_aliases(self):
 		from deadtrees_upload.metadata import find_column_mapping
 		
-		df = pd.DataFrame({
+		df = {
 			"file_name": ["test.tif"],
 			"licence": ["CC BY"],
 			"sensor": ["drone"],
 			"contributor": ["John Smith"],
-		})
+		}
 		
 		mapping, missing = find_column_mapping(df)
 		
@@ -222,13 +256,25 @@ class TestMetadata:
 		assert mapping.get("platform") == "sensor"
 		assert mapping.get("authors") == "contributor"
 	
+	def test_find_column_mapping_prefers_earlier_alias(self):
+		from deadtrees_upload.metadata import find_column_mapping
+		
+		df = {
+			"name": ["other"],
+			"filename": ["test.tif"],
+		}
+		
+		mapping, _ = find_column_mapping(df)
+		
+		assert mapping["filename"] == "filename"
+	
 	def test_find_column_mapping_missing_required(self):
 		from deadtrees_upload.metadata import find_column_mapping
 		
-		df = pd.DataFrame({
+		df = {
 			"filename": ["test.tif"],
 			"license": ["CC BY"],
-		})
+		}
 		
 		mapping, missing = find_column_mapping(df)
 		
@@ -239,15 +285,15 @@ class TestMetadata:
 		from deadtrees_upload.metadata import parse_metadata
 		from deadtrees_upload.models import LicenseEnum, PlatformEnum
 		
-		df = pd.DataFrame({
+		df = {
 			"filename": ["test.tif"],
 			"license": ["CC BY"],
 			"platform": ["drone"],
 			"authors": ["John Smith; Jane Doe"],
 			"acquisition_year": [2024],
-		})
+		}
 		
-		mapping = {col: col for col in df.columns}
+		mapping = {col: col for col in df}
 		metadata_list, errors = parse_metadata(df, mapping)
 		
 		assert len(metadata_list) == 1
@@ -261,15 +307,15 @@ class TestMetadata:
 	def test_parse_metadata_with_acquisition_date(self):
 		from deadtrees_upload.metadata import parse_metadata
 		
-		df = pd.DataFrame({
+		df = {
 			"filename": ["test.tif"],
 			"license": ["CC BY"],
 			"platform": ["drone"],
 			"authors": ["Author"],
 			"acquisition_date": ["2024-06-15"],
-		})
+		}
 		
-		mapping = {col: col for col in df.columns}
+		mapping = {col: col for col in df}
 		metadata_list, errors = parse_metadata(df, mapping)
 		
 		assert len(metadata_list) == 1
@@ -278,10 +324,31 @@ class TestMetadata:
 		assert metadata_list[0].acquisition_month == 6
 		assert metadata_list[0].acquisition_day == 15
 	
-	def test_parse_metadata_with_optional_fields(self):
+	def test_parse_metadata_skips_empty_cells(self):
 		from deadtrees_upload.metadata import parse_metadata
+		import pandas as pd
 		
 		df = pd.DataFrame({
+			"filename": ["a.tif", "b.tif"],
+			"license": ["CC BY", "CC BY"],
+			"platform": ["drone", "drone"],
+			"authors": ["Author", "Author"],
+			"acquisition_year": ["2024", "2023"],
+			"additional_information": ["Note", None],
+		}, dtype=str)
+		
+		# Exercises the DataFrame path production callers use (NaN cells)
+		mapping = {col: col for col in df.columns}
+		metadata_list, errors = parse_metadata(df, mapping)
+		
+		assert len(errors) == 0
+		assert metadata_list[0].additional_information == "Note"
+		assert metadata_list[1].additional_information is None
+	
+	def test_parse_metadata_with_optional_fields(self):
+		from deadtrees_upload.metadata import parse_metadata
+		
+		df = {
 			"filename": ["test.tif"],
 			"license": ["CC BY-SA"],
 			"platform": ["airborne"],
@@ -289,9 +356,9 @@ class TestMetadata:
 			"acquisition_year": ["2024"],
 			"acquisition_month": ["6"],
 			"additional_information": ["Test notes"],
-		})
+		}
 		
-		mapping = {col: col for col in df.columns}
+		mapping = {col: col for col in df}
 		metadata_list, errors = parse_metadata(df, mapping)
 		
 		assert len(metadata_list) == 1
@@ -303,28 +370,62 @@ class TestMetadata:
 	def test_parse_metadata_invalid_license(self):
 		from deadtrees_upload.metadata import parse_metadata
 		
-		df = pd.DataFrame({
+		df = {
 			"filename": ["test.tif"],
 			"license": ["Invalid License"],
 			"platform": ["drone"],
 			"authors": ["John Smith"],
-		})
+		}
 		
-		mapping = {col: col for col in df.columns}
+		mapping = {col: col for col in df}
 		metadata_list, errors = parse_metadata(df, mapping)
 		
 		assert len(metadata_list) == 0
 		assert len(errors) >= 1
 	
+	def test_parse_metadata_repeated_values(self):
+		from deadtrees_upload.metadata import parse_metadata
+		from deadtrees_upload.models import LicenseEnum, PlatformEnum
+		
+		df = {
+			"filename": ["a.tif", "b.tif", "c.tif", "d.tif"],
+			"license": ["CC BY 4.0", "CC BY 4.0", "cc-by-sa", "Invalid License"],
+			"platform": ["UAV", "UAV", "airborne", "drone"],
+			"authors": ["John Smith"] * 4,
+			"acquisition_date": ["2024-06-15", "2024-06-15", "2023", "2024-06-15"],
+		}
+		
+		mapping = {col: col for col in df}
+		metadata_list, errors = parse_metadata(df, mapping)
+		
+		assert [m.license for m in metadata_list] == [LicenseEnum.cc_by, LicenseEnum.cc_by, LicenseEnum.cc_by_sa]
+		assert [m.platform for m in metadata_list] == [PlatformEnum.drone, PlatformEnum.drone, PlatformEnum.airborne]
+		assert [m.acquisition_day for m in metadata_list] == [15, 15, None]
+		assert [row for row, _ in errors] == [5]
+	
+	def test_parse_metadata_rejects_ragged_columns(self):
+		from deadtrees_upload.metadata import parse_metadata, MetadataError
+		
+		df = {
+			"filename": ["a.tif", "b.tif"],
+			"license": ["CC BY"],
+			"platform": ["drone", "drone"],
+			"authors": ["Author", "Author"],
+			"acquisition_year": ["2024", "2024"],
+		}
+		
+		with pytest.raises(MetadataError, match="license has 1"):
+			parse_metadata(df, {col: col for col in df})
+	
 	def test_parse_metadata_missing_required(self):
 		from deadtrees_upload.metadata import parse_metadata
 		
-		df = pd.DataFrame({
+		df = {
 			"filename": ["test.tif"],
 			"license": ["CC BY"],
-		})
+		}
 		
-		mapping = {col: col for col in df.columns}
+		mapping = {col: col for col in df}
 		metadata_list, errors = parse_metadata(df, mapping)
 		
 		assert len(metadata_list) == 0
@@ -354,6 +455,66 @@ class TestDedup:
 		hash2 = get_file_identifier(FIXTURES_DIR / "test_no_date.tif")
 		assert hash1 != hash2
 	
+	def test_calculate_file_hashes(self):
+		from deadtrees_upload.dedup import calculate_file_hashes, get_file_identifier, get_hash_cache_key
+		
+		files = [FIXTURES_DIR / "test_with_date.tif", FIXTURES_DIR / "test_no_date.tif"]
+		cached_key = get_hash_cache_key(files[1])
+		stale_key = f"{files[0].resolve()}:0:0"
+		hashed = []
+		
+		hashes = calculate_file_hashes(
+			files,
+			existing_hashes={cached_key: "cached", stale_key: "stale"},
+			on_file_hashed=lambda path, file_hash, error: hashed.append(path),
+		)
+		
+		assert hashes[get_hash_cache_key(files[0])] == get_file_identifier(files[0])
+		assert hashes[cached_key] == "cached"
+		assert stale_key not in hashes
+		assert sorted(hashed) == sorted(files)
+	
+	def test_calculate_file_hashes_skips_unique_files(self, tmp_path):
+		from deadtrees_upload.dedup import calculate_file_hashes, find_possible_duplicates, QUICK_SAMPLE_SIZE
+		
+		head = b"h" * QUICK_SAMPLE_SIZE
+		same_head_a = tmp_path / "a.tif"
+		same_head_a.write_bytes(head + b"a")
+		same_head_b = tmp_path / "b.tif"
+		same_head_b.write_bytes(head + b"b")
+		other_size = tmp_path / "c.tif"
+		other_size.write_bytes(head + b"cc")
+		files = [same_head_a, same_head_b, other_size]
+		
+		assert find_possible_duplicates(files) == {same_head_a, same_head_b}
+		
+		reported = []
+		hashes = calculate_file_hashes(
+			files,
+			on_file_hashed=lambda path, file_hash, error: reported.append((path, file_hash is None, error)),
+			skip_unique=True,
+		)
+		
+		# Same head but different tails: both hashed in full, and told apart
+		assert len(hashes) == 2
+		assert len(set(hashes.values())) == 2
+		assert (other_size, True, None) in reported
+		assert len(reported) == 3
+	
+	def test_calculate_file_hashes_same_basename(self, tmp_path):
+		from deadtrees_upload.dedup import calculate_file_hashes, get_hash_cache_key
+		
+		first = tmp_path / "a" / "x.tif"
+		second = tmp_path / "b" / "x.tif"
+		for path, content in ((first, b"first"), (second, b"second")):
+			path.parent.mkdir()
+			path.write_bytes(content)
+		
+		hashes = calculate_file_hashes([first, second])
+		
+		assert len(hashes) == 2
+		assert hashes[get_hash_cache_key(first)] != hashes[get_hash_cache_key(second)]
+	
 	def test_session_state_create(self):
 		from deadtrees_upload.dedup import UploadSessionState
 		
@@ -380,6 +541,17 @@ class TestDedup:
 		assert session.dataset_ids["file1.tif"] == 100
 		assert session.files_pending == 2
 	
+	def test_session_state_mark_completed_twice(self):
+		from deadtrees_upload.dedup import UploadSessionState
+		
+		session = UploadSessionState.create("/data", "/meta.csv", "http://api")
+		session.files_total = 3
+		
+		session.mark_completed("file1.tif", dataset_id=100)
+		session.mark_completed("file1.tif", dataset_id=100)
+		
+		assert session.files_pending == 2
+	
 	def test_session_state_mark_failed(self):
 		from deadtrees_upload.dedup import UploadSessionState
 		
@@ -416,21 +588,69 @@ class TestDedup:
 		
 		assert session.is_complete
 	
-	def test_session_state_save_and_load(self):
+	def test_session_state_save_and_load(self, tmp_path):
 		from deadtrees_upload.dedup import UploadSessionState
 		
-		with tempfile.TemporaryDirectory() as tmpdir:
-			session_path = Path(tmpdir) / "session.json"
-			
-			session1 = UploadSessionState.create("/data", "/meta.csv", "http://api")
-			session1.files_total = 5
-			session1.mark_completed("file1.tif", 100)
-			session1.save(session_path)
-			
-			session2 = UploadSessionState.load(session_path)
-			assert session2.session_id == session1.session_id
-			assert session2.files_total == 5
-			assert "file1.tif" in session2.files_completed
+		session_path = tmp_path / "session.json"
+		
+		session1 = UploadSessionState.create("/data", "/meta.csv", "http://api")
+		session1.files_total = 5
+		session1.mark_completed("file1.tif", 100)
+		session1.save(session_path)
+		
+		session2 = UploadSessionState.load(session_path)
+		assert session2.session_id == session1.session_id
+		assert session2.files_total == 5
+		assert "file1.tif" in session2.files_completed
+	
+	def test_session_state_save_if_due(self, tmp_path):
+		from deadtrees_upload.dedup import UploadSessionState
+		
+		session_path = tmp_path / "session.json"
+		session = UploadSessionState.create("/data", "/meta.csv", "http://api")
+		
+		assert session.save_if_due(session_path, interval=60)
+		assert not session.save_if_due(session_path, interval=60)
+		assert list(tmp_path.iterdir()) == [session_path]
+		assert "_last_save" not in session_path.read_text()
+	
+	def test_session_state_load_drops_hashes_from_other_algorithm(self, tmp_path):
+		import json
+		from deadtrees_upload.dedup import UploadSessionState, HASH_ALGORITHM
+		
+		session_path = tmp_path / "session.json"
+		session = UploadSessionState.create("/data", "/meta.csv", "http://api")
+		session.file_hashes = {"a.tif:1:1": "abc"}
+		session.save(session_path)
+		
+		# Same algorithm (and legacy files without the field) keep their hashes
+		assert UploadSessionState.load(session_path).file_hashes == {"a.tif:1:1": "abc"}
+		data = json.loads(session_path.read_text())
+		del data["hash_algorithm"]
+		session_path.write_text(json.dumps(data))
+		assert UploadSessionState.load(session_path).file_hashes == {"a.tif:1:1": "abc"}
+		
+		data["hash_algorithm"] = "md5"
+		session_path.write_text(json.dumps(data))
+		loaded = UploadSessionState.load(session_path)
+		assert loaded.file_hashes == {}
+		assert loaded.hash_algorithm == HASH_ALGORITHM
+	
+	def test_hash_cache_round_trip(self, tmp_path):
+		import json
+		from deadtrees_upload.dedup import get_hash_cache_path, load_hash_cache, save_hash_cache
+		
+		cache_path = get_hash_cache_path(tmp_path)
+		assert load_hash_cache(cache_path) == {}
+		
+		save_hash_cache(cache_path, {"/data/a.tif:10:1": "abc"})
+		assert load_hash_cache(cache_path) == {"/data/a.tif:10:1": "abc"}
+		
+		# Hashes from another algorithm or a corrupt file are ignored
+		cache_path.write_text(json.dumps({"hash_algorithm": "md5", "hashes": {"k": "v"}}))
+		assert load_hash_cache(cache_path) == {}
+		cache_path.write_text("{not json")
+		assert load_hash_cache(cache_path) == {}
 	
 	def test_find_duplicates_by_hash(self):
 		from deadtrees_upload.dedup import find_duplicates_by_hash
@@ -448,6 +668,61 @@ class TestDedup:
 		assert "file2.tif" not in duplicates
 		assert "file3.tif" in duplicates
 	
+	def test_hash_progress_completes_with_batched_updates(self, tmp_path, monkeypatch):
+		from deadtrees_upload import workflow
+		from deadtrees_upload.dedup import UploadSessionState, QUICK_SAMPLE_SIZE
+		from deadtrees_upload.models import FileMetadata, LicenseEnum, PlatformEnum, ValidationResult
+		
+		monkeypatch.setattr(workflow, "PROGRESS_UPDATE_STEPS", 4)
+		results = []
+		for i in range(10):
+			path = tmp_path / f"ortho_{i}.tif"
+			path.write_bytes(bytes([i % 5]) * QUICK_SAMPLE_SIZE + bytes([i]))
+			metadata = FileMetadata(
+				filename=path.name,
+				license=LicenseEnum.cc_by,
+				platform=PlatformEnum.drone,
+				authors=["Test"],
+				acquisition_year=2024,
+				file_path=path,
+			)
+			results.append(ValidationResult(filename=path.name, is_valid=True, metadata=metadata))
+		session = UploadSessionState(
+			session_id="s", created_at="now", data_directory=str(tmp_path), metadata_file="", api_url="http://test",
+		)
+		
+		file_hashes = workflow.calculate_hashes_with_progress(results, session)
+		
+		# Every file shares its size and first bytes with another, so all are hashed
+		assert len(file_hashes) == 10
+		assert len(set(file_hashes.values())) == 10
+	
+	def test_hash_errors_reported_after_progress(self, tmp_path, capsys):
+		from deadtrees_upload import workflow
+		from deadtrees_upload.dedup import UploadSessionState
+		from deadtrees_upload.models import FileMetadata, LicenseEnum, PlatformEnum, ValidationResult
+		
+		results = []
+		for name in ["gone_1.tif", "gone_2.tif"]:
+			metadata = FileMetadata(
+				filename=name,
+				license=LicenseEnum.cc_by,
+				platform=PlatformEnum.drone,
+				authors=["Test"],
+				acquisition_year=2024,
+				file_path=tmp_path / name,
+			)
+			results.append(ValidationResult(filename=name, is_valid=True, metadata=metadata))
+		session = UploadSessionState(
+			session_id="s", created_at="now", data_directory=str(tmp_path), metadata_file="", api_url="http://test",
+		)
+		
+		assert workflow.calculate_hashes_with_progress(results, session) == {}
+		
+		out = capsys.readouterr().out
+		assert "Could not hash gone_1.tif" in out
+		assert "Could not hash gone_2.tif" in out
+	
 	def test_get_session_file_path(self):
 		from deadtrees_upload.dedup import get_session_file_path
 		
@@ -462,40 +737,15 @@ class TestDedup:
 class TestAuth:
 	"""Tests for authentication module (unit tests without API)."""
 	
-	def test_auth_session_is_expired(self):
-		from deadtrees_upload.auth import AuthSession
-		
-		expired_session = AuthSession(
-			access_token="token",
-			refresh_token="refresh",
-			user_id="user123",
-			expires_at=time.time() - 100,
-			supabase_url="http://supabase",
-			supabase_key="key",
-		)
+	def test_auth_session_is_expired(self, make_auth_session):
+		expired_session = make_auth_session(expires_in=-100)
 		assert expired_session.is_expired()
 		
-		valid_session = AuthSession(
-			access_token="token",
-			refresh_token="refresh",
-			user_id="user123",
-			expires_at=time.time() + 3600,
-			supabase_url="http://supabase",
-			supabase_key="key",
-		)
+		valid_session = make_auth_session()
 		assert not valid_session.is_expired()
 	
-	def test_auth_session_is_expired_with_buffer(self):
-		from deadtrees_upload.auth import AuthSession
-		
-		session = AuthSession(
-			access_token="token",
-			refresh_token="refresh",
-			user_id="user123",
-			expires_at=time.time() + 200,
-			supabase_url="http://supabase",
-			supabase_key="key",
-		)
+	def test_auth_session_is_expired_with_buffer(self, make_auth_session):
+		session = make_auth_session(expires_in=200)
 		assert session.is_expired(buffer_seconds=300)
 		assert not session.is_expired(buffer_seconds=100)
 	
@@ -505,20 +755,45 @@ class TestAuth:
 		error = AuthError("Test error")
 		assert str(error) == "Test error"
 	
-	def test_save_and_load_auth_session(self, tmp_path, monkeypatch):
-		from deadtrees_upload.auth import AuthSession, save_auth_session, load_auth_session, get_auth_session_path
+	def test_get_auth_header_tracks_token(self, make_auth_session):
+		session = make_auth_session(access_token="token-1")
+		
+		header = session.get_auth_header()
+		assert header == "Bearer token-1"
+		assert session.get_auth_header() is header
+		
+		session.access_token = "token-2"
+		assert session.get_auth_header() == "Bearer token-2"
+	
+	def test_verify_token_decodes_exp_locally(self):
+		import base64
+		from deadtrees_upload.auth import verify_token
+		
+		def make_token(claims):
+			payload = base64.urlsafe_b64encode(json.dumps(claims).encode()).rstrip(b"=").decode()
+			return f"header.{payload}.signature"
+		
+		assert verify_token(make_token({"exp": time.time() + 3600}), "http://api")
+		assert not verify_token(make_token({"exp": time.time() - 10}), "http://api")
+		assert not verify_token("not-a-jwt", "http://api")
+	
+	def test_session_matches_email(self, make_auth_session):
+		import base64
+		from deadtrees_upload.auth import session_matches_email
+		
+		payload = base64.urlsafe_b64encode(json.dumps({"email": "User@Example.com"}).encode()).rstrip(b"=").decode()
+		session = make_auth_session(access_token=f"header.{payload}.signature")
+		
+		assert session_matches_email(session, "user@example.com")
+		assert not session_matches_email(session, "other@example.com")
+	
+	def test_save_and_load_auth_session(self, auth_cache_dir, make_auth_session):
+		from deadtrees_upload.auth import save_auth_session, load_auth_session, get_auth_session_path
+		import os
 		
-		monkeypatch.setenv("DEADTREES_UPLOAD_CACHE_DIR", str(tmp_path))
 		api_url = "http://api.example.com"
 		
-		session = AuthSession(
-			access_token="token",
-			refresh_token="refresh",
-			user_id="user123",
-			expires_at=time.time() + 3600,
-			supabase_url="http://supabase",
-			supabase_key="key",
-		)
+		session = make_auth_session()
 		
 		save_auth_session(session, api_url)
 		loaded = load_auth_session(api_url)
@@ -528,21 +803,59 @@ class TestAuth:
 		assert loaded.refresh_token == "refresh"
 		assert loaded.user_id == "user123"
 		assert get_auth_session_path(api_url).exists()
+		if os.name == "posix":
+			assert get_auth_session_path(api_url).stat().st_mode & 0o777 == 0o600
+	
+	def test_get_shared_client_reuses_client_per_base_url(self):
+		from deadtrees_upload.auth import get_shared_client
+		
+		client = get_shared_client("http://shared.example.com")
+		assert get_shared_client("http://shared.example.com") is client
+		assert get_shared_client("http://other.example.com") is not client
+		
+		keyed = get_shared_client("http://shared.example.com", "anon-key")
+		assert keyed is not client
+		assert keyed.headers["apikey"] == "anon-key"
+		assert "apikey" not in client.headers
 	
-	def test_get_cached_session_refreshes_expired(self, tmp_path, monkeypatch):
+	def test_auth_session_path_follows_cache_dir(self, tmp_path, monkeypatch):
+		from deadtrees_upload.auth import get_auth_session_path
+		
+		api_url = "http://api.example.com"
+		monkeypatch.setenv("DEADTREES_UPLOAD_CACHE_DIR", str(tmp_path / "a"))
+		first = get_auth_session_path(api_url)
+		monkeypatch.setenv("DEADTREES_UPLOAD_CACHE_DIR", str(tmp_path / "b"))
+		
+		assert get_auth_session_path(api_url).parent == (tmp_path / "b").resolve()
+		assert first.parent == (tmp_path / "a").resolve()
+	
+	def test_load_auth_session_skips_stale_and_reads_legacy(self, auth_cache_dir, make_auth_session):
+		from deadtrees_upload.auth import save_auth_session, load_auth_session, get_auth_session_path
+		
+		api_url = "http://api.example.com"
+		
+		session = make_auth_session(expires_in=-(60 * 24 * 3600))
+		save_auth_session(session, api_url)
+		assert load_auth_session(api_url) is None
+		
+		# Single-line JSON files from older versions still load
+		path = get_auth_session_path(api_url)
+		path.write_text(json.dumps({
+			"access_token": "token",
+			"expires_at": time.time() + 3600,
+			"supabase_url": "http://supabase",
+			"supabase_key": "key",
+		}))
+		loaded = load_auth_session(api_url)
+		assert loaded is not None
+		assert loaded.access_token == "token"
+	
+	def test_get_cached_session_refreshes_expired(self, auth_cache_dir, monkeypatch, make_auth_session):
 		from deadtrees_upload.auth import AuthSession, save_auth_session, get_cached_session, load_auth_session
 		
-		monkeypatch.setenv("DEADTREES_UPLOAD_CACHE_DIR", str(tmp_path))
 		api_url = "http://api.example.com"
 		
-		session = AuthSession(
-			access_token="old_token",
-			refresh_token="refresh",
-			user_id="user123",
-			expires_at=time.time() - 10,
-			supabase_url="http://supabase",
-			supabase_key="key",
-		)
+		session = make_auth_session(expires_in=-10, access_token="old_token")
 		save_auth_session(session, api_url)
 		
 		called = {"refreshed": False}
@@ -564,20 +877,12 @@ class TestAuth:
 		assert loaded is not None
 		assert loaded.access_token == "new_token"
 	
-	def test_get_cached_session_returns_none_on_refresh_error(self, tmp_path, monkeypatch):
+	def test_get_cached_session_returns_none_on_refresh_error(self, auth_cache_dir, monkeypatch, make_auth_session):
 		from deadtrees_upload.auth import AuthSession, save_auth_session, get_cached_session, AuthError
 		
-		monkeypatch.setenv("DEADTREES_UPLOAD_CACHE_DIR", str(tmp_path))
 		api_url = "http://api.example.com"
 		
-		session = AuthSession(
-			access_token="old_token",
-			refresh_token="refresh",
-			user_id="user123",
-			expires_at=time.time() - 10,
-			supabase_url="http://supabase",
-			supabase_key="key",
-		)
+		session = make_auth_session(expires_in=-10, access_token="old_token")
 		save_auth_session(session, api_url)
 		
 		def fake_refresh(self):
@@ -587,6 +892,73 @@ class TestAuth:
 		
 		cached = get_cached_session(api_url)
 		assert cached is None
+	
+	def test_get_valid_token_refreshes_once_when_concurrent(self, monkeypatch, make_auth_session):
+		from deadtrees_upload.auth import AuthSession
+		from concurrent.futures import ThreadPoolExecutor
+		
+		session = make_auth_session(expires_in=-10, access_token="old_token")
+		
+		calls = []
+		
+		def fake_refresh(self):
+			calls.append(1)
+			time.sleep(0.05)
+			self.access_token = "new_token"
+			self.expires_at = time.time() + 3600
+		
+		monkeypatch.setattr(AuthSession, "refresh", fake_refresh, raising=True)
+		
+		with ThreadPoolExecutor(max_workers=8) as executor:
+			tokens = list(executor.map(lambda _: session.get_valid_token(), range(8)))
+		
+		assert tokens == ["new_token"] * 8
+		assert len(calls) == 1
+	
+	def test_get_valid_token_refreshes_in_background_before_expiry(self, monkeypatch, make_auth_session):
+		from deadtrees_upload.auth import AuthSession
+		
+		session = make_auth_session(expires_in=300, access_token="old_token")
+		
+		def fake_refresh(self):
+			self.access_token = "new_token"
+			self.expires_at = time.time() + 3600
+		
+		monkeypatch.setattr(AuthSession, "refresh", fake_refresh, raising=True)
+		
+		# Token is still usable, so it is served while the refresh runs
+		assert session.get_valid_token() in ("old_token", "new_token")
+		future = session._refresh_future
+		if future is not None:
+			future.result(timeout=5)
+		assert session.get_valid_token() == "new_token"
+	
+	def test_get_valid_token_backs_off_after_failed_background_refresh(self, monkeypatch, make_auth_session):
+		from deadtrees_upload.auth import AuthSession, AuthError
+		
+		session = make_auth_session(expires_in=300, access_token="old_token")
+		attempts = []
+		
+		def failing_refresh(self):
+			attempts.append(1)
+			raise AuthError("refresh token revoked")
+		
+		monkeypatch.setattr(AuthSession, "refresh", failing_refresh, raising=True)
+		
+		assert session.get_valid_token() == "old_token"
+		with pytest.raises(AuthError):
+			session._refresh_future.result(timeout=5)
+		
+		# Within the retry delay no new refresh is scheduled
+		for _ in range(10):
+			assert session.get_valid_token() == "old_token"
+		assert session._refresh_future is None
+		assert len(attempts) == 1
+		
+		# Once the token is about to expire the error reaches the caller
+		session.expires_at = time.time() + 30
+		with pytest.raises(AuthError, match="revoked"):
+			session.get_valid_token()
 
 
 # =============================================================================
@@ -603,6 +975,7 @@ class TestGeoTIFFValidation:
 		
 		assert result.is_valid
 		assert len(result.errors) == 0
+		assert result.file_size == (FIXTURES_DIR / "test_with_date.tif").stat().st_size
 	
 	def test_validate_geotiff_nonexistent(self):
 		from deadtrees_upload.validate_geotiff import validate_geotiff
@@ -612,18 +985,49 @@ class TestGeoTIFFValidation:
 		assert not result.is_valid
 		assert "does not exist" in result.errors[0].lower()
 	
-	def test_validate_geotiff_empty_file(self):
+	def test_validate_geotiff_empty_file(self, tmp_path):
 		from deadtrees_upload.validate_geotiff import validate_geotiff
 		
-		with tempfile.NamedTemporaryFile(suffix=".tif", delete=False) as f:
-			temp_path = Path(f.name)
+		empty = tmp_path / "empty.tif"
+		empty.touch()
+		
+		result, _ = validate_geotiff(empty)
+		assert not result.is_valid
+		assert "empty" in result.errors[0].lower()
+	
+	def test_validate_geotiff_plain_tiff_rejected_from_header(self, tmp_path, monkeypatch):
+		from PIL import Image
+		import rasterio
+		from deadtrees_upload.validate_geotiff import validate_geotiff, NO_GEOREFERENCING_ERROR
+		
+		path = tmp_path / "plain.tif"
+		Image.new("RGB", (8, 8)).save(path)
 		
-		try:
-			result, _ = validate_geotiff(temp_path)
-			assert not result.is_valid
-			assert "empty" in result.errors[0].lower()
-		finally:
-			temp_path.unlink()
+		def fail_open(*args, **kwargs):
+			raise AssertionError("rasterio should not be opened")
+		monkeypatch.setattr(rasterio, "open", fail_open)
+		
+		result, _ = validate_geotiff(path)
+		assert not result.is_valid
+		assert result.errors == [NO_GEOREFERENCING_ERROR]
+	
+	def test_validate_geotiff_sidecar_defers_to_rasterio(self, tmp_path):
+		from PIL import Image
+		from deadtrees_upload.validate_geotiff import _lacks_georeferencing
+		
+		path = tmp_path / "plain.tif"
+		Image.new("RGB", (8, 8)).save(path)
+		assert _lacks_georeferencing(path)
+		
+		(tmp_path / "plain.tfw").write_text("1\n0\n0\n-1\n500000\n5000000\n")
+		assert not _lacks_georeferencing(path)
+		
+		upper = tmp_path / "ORTHO.TIF"
+		Image.new("RGB", (8, 8)).save(upper)
+		assert _lacks_georeferencing(upper)
+		(tmp_path / "ORTHO.TIF.AUX.XML").write_text("<PAMDataset/>")
+		assert not _lacks_georeferencing(upper)
+		assert not _lacks_georeferencing(FIXTURES_DIR / "test_with_date.tif")
 	
 	def test_extract_date_from_geotiff_with_date(self):
 		from deadtrees_upload.validate_geotiff import extract_date_from_geotiff
@@ -642,6 +1046,71 @@ class TestGeoTIFFValidation:
 		assert year is None
 		assert month is None
 		assert day is None
+	
+	def test_header_tags_match_rasterio(self):
+		from deadtrees_upload.validate_geotiff import _read_tiff_tags, _read_rasterio_tags
+		
+		path = FIXTURES_DIR / "test_with_date.tif"
+		header_tags = _read_tiff_tags(path)
+		rasterio_tags = _read_rasterio_tags(path)
+		
+		assert header_tags['acquisitionStartDate'] == rasterio_tags['acquisitionStartDate']
+		assert header_tags['TIFFTAG_DATETIME'] == rasterio_tags['TIFFTAG_DATETIME']
+	
+	def test_header_reads_only_requested_values(self, tmp_path):
+		import struct
+		from deadtrees_upload.validate_geotiff import _read_tiff_tags, TIFF_HEADER_READ_SIZE
+		
+		# Big-endian classic TIFF: DateTime stored past the initial read, and a
+		# TileOffsets entry pointing beyond the end of the file
+		date_offset = TIFF_HEADER_READ_SIZE + 100
+		ifd = struct.pack(">H", 2)
+		ifd += struct.pack(">HHII", 306, 2, 20, date_offset)
+		ifd += struct.pack(">HHII", 324, 4, 1_000_000, 10**9)
+		ifd += struct.pack(">I", 0)
+		data = b"MM" + struct.pack(">HI", 42, 8) + ifd
+		data = data.ljust(date_offset, b"\x00") + b"2022:01:02 03:04:05\x00"
+		
+		path = tmp_path / "sparse.tif"
+		path.write_bytes(data)
+		
+		assert _read_tiff_tags(path) == {"TIFFTAG_DATETIME": "2022:01:02 03:04:05"}
+	
+	def test_header_rejects_oversized_tag_value(self, tmp_path):
+		import struct
+		from deadtrees_upload.validate_geotiff import _read_tiff_tags, MAX_TAG_VALUE_SIZE
+		
+		# DateTime count claims more than MAX_TAG_VALUE_SIZE bytes
+		ifd = struct.pack(">H", 1) + struct.pack(">HHII", 306, 2, MAX_TAG_VALUE_SIZE + 1, 26) + struct.pack(">I", 0)
+		path = tmp_path / "corrupt.tif"
+		path.write_bytes(b"MM" + struct.pack(">HI", 42, 8) + ifd)
+		
+		with pytest.raises(ValueError, match="too large"):
+			_read_tiff_tags(path)
+	
+	def test_extract_date_falls_back_on_bad_header(self, tmp_path):
+		from deadtrees_upload.validate_geotiff import extract_date_from_geotiff
+		
+		bogus = tmp_path / "bogus.tif"
+		bogus.write_bytes(b"not a tiff at all")
+		
+		assert extract_date_from_geotiff(bogus) == (None, None, None)
+	
+	def test_extract_date_is_memoized_per_file_version(self, tmp_path):
+		import shutil
+		from deadtrees_upload import validate_geotiff as vg
+		
+		path = tmp_path / "copy.tif"
+		shutil.copy(FIXTURES_DIR / "test_with_date.tif", path)
+		vg._extract_date_cached.cache_clear()
+		
+		assert vg.extract_date_from_geotiff(path) == (2024, 6, 15)
+		assert vg.extract_date_from_geotiff(path) == (2024, 6, 15)
+		assert vg._extract_date_cached.cache_info().hits == 1
+		
+		# Replacing the file changes size/mtime and forces a fresh read
+		shutil.copy(FIXTURES_DIR / "test_no_date.tif", path)
+		assert vg.extract_date_from_geotiff(path) == (None, None, None)
 
 
 # =============================================================================
@@ -681,6 +1150,17 @@ class TestZIPValidation:
 		assert not result.is_valid
 		assert "empty" in result.errors[0].lower()
 	
+	def test_validate_zip_truncated_skips_open(self, tmp_path, monkeypatch):
+		from deadtrees_upload import validate_zip as vz
+		
+		zip_path = tmp_path / "truncated.zip"
+		zip_path.write_bytes(b"PK\x05\x06")
+		monkeypatch.setattr(vz.zipfile, "ZipFile", None)
+		
+		result = vz.validate_zip(zip_path)
+		assert not result.is_valid
+		assert result.errors == ["Invalid or corrupted ZIP file"]
+	
 	def test_validate_zip_no_images(self, tmp_path):
 		from deadtrees_upload.validate_zip import validate_zip
 		
@@ -693,6 +1173,56 @@ class TestZIPValidation:
 		assert not result.is_valid
 		assert "no image" in result.errors[0].lower()
 	
+	def test_validate_zip_spot_check_finds_bad_local_header(self, tmp_path):
+		import zipfile
+		from deadtrees_upload.validate_zip import validate_zip
+		
+		path = tmp_path / "images.zip"
+		with zipfile.ZipFile(path, "w") as zf:
+			for i in range(3):
+				zf.writestr(f"img_{i}.jpg", b"jpeg" * 100)
+		
+		assert not any("Corrupted" in e for e in validate_zip(path).errors)
+		
+		# Corrupt the local header signature of the last member
+		data = bytearray(path.read_bytes())
+		offset = data.rfind(b"PK\x03\x04")
+		data[offset:offset + 4] = b"XXXX"
+		path.write_bytes(bytes(data))
+		
+		result = validate_zip(path)
+		assert not result.is_valid
+		assert "img_2.jpg" in result.errors[0]
+	
+	def test_validate_and_date_share_one_archive_pass(self, tmp_path, monkeypatch):
+		import shutil
+		import zipfile
+		from deadtrees_upload import validate_zip as validate_zip_module
+		
+		path = tmp_path / "images.zip"
+		shutil.copy(FIXTURES_DIR / "test_images_with_exif.zip", path)
+		
+		opened = []
+		real_zipfile = zipfile.ZipFile
+		
+		def counting_zipfile(*args, **kwargs):
+			opened.append(args[0])
+			return real_zipfile(*args, **kwargs)
+		
+		monkeypatch.setattr(validate_zip_module.zipfile, "ZipFile", counting_zipfile)
+		
+		assert validate_zip_module.validate_zip(path).is_valid
+		assert validate_zip_module.extract_date_from_zip(path) == (2024, 7, 1)
+		assert len(opened) == 1
+	
+	def test_parse_exif_date(self):
+		from deadtrees_upload.validate_zip import _parse_exif_date
+		
+		assert _parse_exif_date("2024:07:01 10:00:00") == (2024, 7, 1)
+		assert _parse_exif_date("0000:00:00 00:00:00") is None
+		assert _parse_exif_date("2024-07-01") is None
+		assert _parse_exif_date("") is None
+	
 	def test_extract_date_from_zip_with_exif(self):
 		from deadtrees_upload.validate_zip import extract_date_from_zip
 		
@@ -702,6 +1232,84 @@ class TestZIPValidation:
 		assert month == 7
 		assert day == 1
 	
+	def test_exif_read_from_jpeg_segments(self, tmp_path):
+		import struct
+		import zipfile
+		from deadtrees_upload.validate_zip import check_image_has_gps, extract_date_from_zip
+		
+		# Big-endian EXIF block: IFD0 -> Exif IFD (DateTimeOriginal) and GPS IFD
+		tiff = b"MM" + struct.pack(">HI", 42, 8)
+		tiff += struct.pack(">H", 2) + struct.pack(">HHII", 0x8769, 4, 1, 38) + struct.pack(">HHII", 0x8825, 4, 1, 76) + struct.pack(">I", 0)
+		tiff += struct.pack(">H", 1) + struct.pack(">HHII", 0x9003, 2, 20, 56) + struct.pack(">I", 0)
+		tiff += b"2021:08:09 10:11:12\x00"
+		tiff += struct.pack(">H", 2) + struct.pack(">HHII", 2, 5, 3, 106) + struct.pack(">HHII", 4, 5, 3, 130) + struct.pack(">I", 0)
+		tiff += struct.pack(">6I", 51, 1, 30, 1, 0, 1) + struct.pack(">6I", 7, 1, 50, 1, 0, 1)
+		
+		app0 = b"JFIF\x00\x01\x01\x00\x00\x01\x00\x01\x00\x00"
+		app1 = b"Exif\x00\x00" + tiff
+		jpeg = (
+			b"\xff\xd8"
+			+ b"\xff\xe0" + struct.pack(">H", len(app0) + 2) + app0
+			+ b"\xff\xe1" + struct.pack(">H", len(app1) + 2) + app1
+			+ b"\xff\xda" + b"\x00" * 1000
+		)
+		
+		path = tmp_path / "images.zip"
+		with zipfile.ZipFile(path, "w") as zf:
+			zf.writestr("img_0.jpg", jpeg)
+			zf.writestr("img_1.jpg", b"\xff\xd8\xff\xda" + b"\x00" * 100)
+		
+		assert extract_date_from_zip(path) == (2021, 8, 9)
+		with zipfile.ZipFile(path) as zf:
+			assert check_image_has_gps(zf, "img_0.jpg")
+			assert not check_image_has_gps(zf, "img_1.jpg")
+	
+	def test_read_member_exif_stops_at_malformed_segment(self, tmp_path):
+		import zipfile
+		from deadtrees_upload.validate_zip import EXIF_SCAN_LIMIT, _read_member_exif
+		
+		# APP0 with a length field of 1, followed by a large image body
+		jpeg = b"\xff\xd8\xff\xe0\x00\x01" + b"\x00" * (4 * EXIF_SCAN_LIMIT)
+		path = tmp_path / "images.zip"
+		with zipfile.ZipFile(path, "w") as zf:
+			zf.writestr("bad.jpg", jpeg)
+		
+		with zipfile.ZipFile(path) as zf:
+			reads = []
+			real_open = zf.open
+			
+			def tracking_open(name):
+				member = real_open(name)
+				real_read = member.read
+				member.read = lambda n=-1: reads.append(n) or real_read(n)
+				return member
+			
+			zf.open = tracking_open
+			assert _read_member_exif(zf, "bad.jpg") is None
+		
+		assert all(0 <= n <= EXIF_SCAN_LIMIT for n in reads)
+	
+	def test_validate_zip_corrupt_gps_ifd_only_warns(self, tmp_path):
+		import struct
+		import zipfile
+		from deadtrees_upload.validate_zip import validate_zip, extract_date_from_zip
+		
+		# IFD0 points at a GPS IFD past the end of the EXIF block
+		tiff = b"MM" + struct.pack(">HI", 42, 8)
+		tiff += struct.pack(">H", 1) + struct.pack(">HHII", 0x8825, 4, 1, 5000) + struct.pack(">I", 0)
+		app1 = b"Exif\x00\x00" + tiff
+		jpeg = b"\xff\xd8" + b"\xff\xe1" + struct.pack(">H", len(app1) + 2) + app1 + b"\xff\xda" + b"\x00" * 100
+		
+		path = tmp_path / "images.zip"
+		with zipfile.ZipFile(path, "w") as zf:
+			for i in range(3):
+				zf.writestr(f"img_{i}.jpg", jpeg)
+		
+		result = validate_zip(path)
+		assert result.is_valid
+		assert any("GPS" in warning for warning in result.warnings)
+		assert extract_date_from_zip(path) == (None, None, None)
+	
 	def test_extract_date_from_zip_no_exif(self):
 		from deadtrees_upload.validate_zip import extract_date_from_zip
 		
@@ -726,43 +1334,43 @@ class TestFileDiscovery:
 		assert any(f.name == "test_with_date.tif" for f in files)
 		assert any(f.name == "test_images_with_exif.zip" for f in files)
 	
-	def test_find_uploadable_files_geotiff(self, tmp_path):
-		from deadtrees_upload.validation import find_uploadable_files
+	def test_find_metadata_files_in_directory(self, tmp_path):
+		from deadtrees_upload.prompts import find_metadata_files_in_directory
 		
-		(tmp_path / "test1.tif").touch()
-		(tmp_path / "test2.tiff").touch()
-		(tmp_path / "readme.txt").touch()
+		(tmp_path / "b.csv").touch()
+		(tmp_path / "A.XLSX").touch()
+		(tmp_path / "notes.txt").touch()
+		(tmp_path / "dir.csv").mkdir()
 		
-		files, file_types = find_uploadable_files(tmp_path)
+		found = find_metadata_files_in_directory(tmp_path)
 		
-		assert len(files) == 2
-		assert all(f.suffix.lower() in [".tif", ".tiff"] for f in files)
-		assert file_types["test1.tif"] == "GeoTIFF"
-		assert file_types["test2.tiff"] == "GeoTIFF"
+		assert [f.name for f in found] == ["A.XLSX", "b.csv"]
 	
-	def test_find_uploadable_files_zip(self, tmp_path):
+	def test_find_uploadable_files_geotiff(self, uploadable_tree):
 		from deadtrees_upload.validation import find_uploadable_files
 		
-		(tmp_path / "images.zip").touch()
-		(tmp_path / "data.zip").touch()
+		files, file_types = find_uploadable_files(uploadable_tree)
+		geotiffs = [f for f in files if file_types[f.name] == "GeoTIFF"]
 		
-		files, file_types = find_uploadable_files(tmp_path)
-		
-		assert len(files) == 2
-		assert file_types["images.zip"] == "ZIP"
+		assert sorted(f.name for f in geotiffs) == ["test1.tif", "test2.tiff"]
+		assert all(f.suffix.lower() in [".tif", ".tiff"] for f in geotiffs)
 	
-	def test_find_uploadable_files_mixed(self, tmp_path):
+	def test_find_uploadable_files_zip(self, uploadable_tree):
 		from deadtrees_upload.validation import find_uploadable_files
 		
-		(tmp_path / "ortho.tif").touch()
-		(tmp_path / "raw.zip").touch()
-		(tmp_path / "notes.txt").touch()
+		files, file_types = find_uploadable_files(uploadable_tree)
+		zips = [f for f in files if file_types[f.name] == "ZIP"]
 		
-		files, file_types = find_uploadable_files(tmp_path)
+		assert sorted(f.name for f in zips) == ["data.zip", "images.zip"]
+	
+	def test_find_uploadable_files_mixed(self, uploadable_tree):
+		from deadtrees_upload.validation import find_uploadable_files
 		
-		assert len(files) == 2
-		assert file_types["ortho.tif"] == "GeoTIFF"
-		assert file_types["raw.zip"] == "ZIP"
+		files, file_types = find_uploadable_files(uploadable_tree)
+		
+		assert len(files) == 4
+		assert "notes.txt" not in file_types
+		assert all(f.parent == uploadable_tree for f in files)
 	
 	def test_find_uploadable_files_single_tif(self):
 		from deadtrees_upload.validation import find_uploadable_files
@@ -783,18 +1391,15 @@ class TestFileDiscovery:
 		assert len(files) == 1
 		assert file_types[single_file.name] == "ZIP"
 	
-	def test_find_uploadable_files_invalid_extension(self):
+	def test_find_uploadable_files_invalid_extension(self, tmp_path):
 		from deadtrees_upload.validation import find_uploadable_files, ValidationError
 		
-		with tempfile.NamedTemporaryFile(suffix=".txt", delete=False) as f:
-			temp_path = Path(f.name)
+		text_file = tmp_path / "notes.txt"
+		text_file.touch()
 		
-		try:
-			with pytest.raises(ValidationError) as exc_info:
-				find_uploadable_files(temp_path)
-			assert "not supported" in str(exc_info.value).lower()
-		finally:
-			temp_path.unlink()
+		with pytest.raises(ValidationError) as exc_info:
+			find_uploadable_files(text_file)
+		assert "not supported" in str(exc_info.value).lower()
 	
 	def test_detect_upload_type(self):
 		from deadtrees_upload.validation import detect_upload_type
@@ -893,6 +1498,34 @@ class TestFileDiscovery:
 		assert len(matched) == 1
 		assert "ortho_003.tif" in unmatched_files
 		assert "ortho_002.tif" in unmatched_metadata
+	
+	def test_validate_all_keeps_input_order(self):
+		from deadtrees_upload.models import FileMetadata, LicenseEnum, PlatformEnum
+		from deadtrees_upload.validation import validate_all
+		
+		def make(name, path):
+			return FileMetadata(
+				filename=name,
+				license=LicenseEnum.cc_by,
+				platform=PlatformEnum.drone,
+				authors=["Test"],
+				acquisition_year=2020,
+				file_path=path,
+			)
+		
+		geotiff = make("test_with_date.tif", FIXTURES_DIR / "test_with_date.tif")
+		matched = [
+			geotiff,
+			make("missing.tif", None),
+			make("test_images_with_exif.zip", FIXTURES_DIR / "test_images_with_exif.zip"),
+		]
+		
+		results = validate_all(matched)
+		
+		assert [r.filename for r in results] == ["test_with_date.tif", "missing.tif", "test_images_with_exif.zip"]
+		assert results[1].errors == ["No file path set"]
+		assert results[0].metadata is geotiff
+		assert results[2].metadata is matched[2]
 
 
 # =============================================================================
@@ -929,6 +1562,8 @@ class TestTemplateWizard:
 		assert parse_date_input("2024-06-15") == (2024, 6, 15)
 		assert parse_date_input("2024-06") == (2024, 6, None)
 		assert parse_date_input("2024") == (2024, None, None)
+		assert parse_date_input(" 2024-6-5 ") == (2024, 6, 5)
+		assert parse_date_input("2024-") == (None, None, None)
 		assert parse_date_input("invalid") == (None, None, None)
 		assert parse_date_input("") == (None, None, None)
 	
@@ -939,6 +1574,7 @@ class TestTemplateWizard:
 		assert format_date(2024, 6, None) == "2024-06"
 		assert format_date(2024, None, None) == "2024"
 		assert format_date(None, None, None) == "-"
+		assert format_date(2024, None, 15) == "2024"
 	
 	def test_create_template_dataframe(self):
 		from deadtrees_upload.template import FileInfo, create_template_dataframe
@@ -967,6 +1603,363 @@ class TestTemplateWizard:
 		assert df.iloc[0]["filename"] == "test.tif"
 		assert df.iloc[0]["license"] == "CC BY"
 		assert df.iloc[0]["acquisition_year"] == 2024
+	
+	def test_create_template_dataframe_missing_dates_stay_integer(self, tmp_path):
+		from deadtrees_upload.template import FileInfo, create_template_dataframe
+		
+		file_infos = [
+			FileInfo(filename="a.tif", file_path=Path("a.tif"), file_type="GeoTIFF", confirmed_year=2024, confirmed_month=6),
+			FileInfo(filename="b.tif", file_path=Path("b.tif"), file_type="GeoTIFF"),
+		]
+		global_values = {"license": "CC BY", "platform": "drone", "authors": "Author", "data_access": "public"}
+		
+		df = create_template_dataframe(file_infos, global_values)
+		out = tmp_path / "metadata.csv"
+		df.to_csv(out, index=False)
+		
+		lines = out.read_text().splitlines()
+		assert lines[1] == "a.tif,CC BY,drone,Author,2024,6,,public"
+		assert lines[2] == "b.tif,CC BY,drone,Author,,,,public"
+	
+	def test_save_template_writes_unix_newlines(self, tmp_path):
+		import pandas as pd
+		from deadtrees_upload.template import save_template
+		
+		out = tmp_path / "metadata.csv"
+		save_template(pd.DataFrame({"filename": ["ä.tif"], "authors": ["A, B"]}), out)
+		
+		assert out.read_bytes() == 'filename,authors\nä.tif,"A, B"\n'.encode("utf-8")
+
+
+
+# =============================================================================
+# UPLOAD (upload.py)
+# =============================================================================
+
+class TestUpload:
+	"""Tests for chunked upload helpers."""
+	
+	def test_chunk_reader_streams_window(self):
+		import httpx
+		from deadtrees_upload.upload import ChunkReader
+		
+		payload = bytes(range(256)) * 10
+		reader = ChunkReader(memoryview(payload)[1000:1500])
+		request = httpx.Request(
+			"POST", "http://test/upload",
+			files={"file": ("data.bin", reader, "application/octet-stream")},
+		)
+		body = request.read()
+		
+		# Window content is sent and Content-Length is known up front
+		assert payload[1000:1500] in body
+		assert int(request.headers["Content-Length"]) == len(body)
+		
+		# Rewinding yields the same bytes again for retries
+		reader.seek(0)
+		assert reader.read() == payload[1000:1500]
+	
+	def test_upload_file_sends_final_chunk_last(self, tmp_path, monkeypatch):
+		import re
+		import threading
+		import httpx
+		from deadtrees_upload import upload
+		from deadtrees_upload.models import FileMetadata, LicenseEnum, PlatformEnum
+		
+		path = tmp_path / "ortho.tif"
+		path.write_bytes(b"\xfe" * 1050)
+		
+		received = []
+		lock = threading.Lock()
+		
+		def handler(request: httpx.Request) -> httpx.Response:
+			body = request.read()
+			index = int(re.search(rb'name="chunk_index"\r\n\r\n(\d+)', body).group(1))
+			with lock:
+				received.append((index, body.count(b"\xfe")))
+			return httpx.Response(200, json={"id": 42})
+		
+		real_client = httpx.Client
+		monkeypatch.setattr(
+			upload.httpx, "Client",
+			lambda **kwargs: real_client(transport=httpx.MockTransport(handler), **kwargs),
+		)
+		
+		metadata = FileMetadata(
+			filename="ortho.tif",
+			license=LicenseEnum.cc_by,
+			platform=PlatformEnum.drone,
+			authors=["Test"],
+			acquisition_year=2024,
+			file_path=path,
+		)
+		result = upload.upload_file(metadata, "token", "http://test", chunk_size=100, parallel_chunks=4)
+		
+		assert result.success
+		assert result.dataset_id == 42
+		assert len(received) == 11
+		assert received[-1] == (10, 50)
+		assert sorted(received)[:10] == [(i, 100) for i in range(10)]
+		
+		# Without opting in, chunks arrive strictly in chunk_index order
+		received.clear()
+		assert upload.upload_file(metadata, "token", "http://test", chunk_size=100).success
+		assert received == [(i, 100) for i in range(10)] + [(10, 50)]
+	
+	def test_upload_file_leaves_shared_client_open(self, tmp_path):
+		import httpx
+		from deadtrees_upload.upload import upload_file
+		from deadtrees_upload.models import FileMetadata, LicenseEnum, PlatformEnum
+		
+		path = tmp_path / "ortho.tif"
+		path.write_bytes(b"data")
+		metadata = FileMetadata(
+			filename="ortho.tif",
+			license=LicenseEnum.cc_by,
+			platform=PlatformEnum.drone,
+			authors=["Test"],
+			acquisition_year=2024,
+			file_path=path,
+		)
+		
+		transport = httpx.MockTransport(lambda request: httpx.Response(200, json={"id": 7}))
+		with httpx.Client(transport=transport) as client:
+			first = upload_file(metadata, "token", "http://test", client=client)
+			second = upload_file(metadata, "token", "http://test", client=client)
+			
+			assert first.dataset_id == second.dataset_id == 7
+			assert not client.is_closed
+	
+	def test_upload_file_retry_resends_same_body(self, tmp_path):
+		import httpx
+		from deadtrees_upload.upload import upload_file
+		from deadtrees_upload.models import FileMetadata, LicenseEnum, PlatformEnum
+		
+		path = tmp_path / "ortho.tif"
+		path.write_bytes(b"chunk-data")
+		metadata = FileMetadata(
+			filename="ortho.tif",
+			license=LicenseEnum.cc_by,
+			platform=PlatformEnum.drone,
+			authors=["Test"],
+			acquisition_year=2024,
+			file_path=path,
+		)
+		
+		bodies = []
+		
+		def handler(request: httpx.Request) -> httpx.Response:
+			bodies.append(request.read())
+			if len(bodies) == 1:
+				return httpx.Response(500, json={"detail": "try again"})
+			return httpx.Response(200, json={"id": 1})
+		
+		with httpx.Client(transport=httpx.MockTransport(handler)) as client:
+			result = upload_file(metadata, "token", "http://test", client=client)
+		
+		assert result.success
+		assert len(bodies) == 2
+		assert bodies[0] == bodies[1]
+		assert b"chunk-data" in bodies[1]
+	
+	def test_do_upload_triggers_processing_for_each_upload(self, monkeypatch):
+		from deadtrees_upload import workflow
+		from deadtrees_upload.models import FileMetadata, LicenseEnum, PlatformEnum, UploadResult, ValidationResult
+		
+		results = []
+		for i in range(3):
+			metadata = FileMetadata(
+				filename=f"ortho_{i}.tif",
+				license=LicenseEnum.cc_by,
+				platform=PlatformEnum.drone,
+				authors=["Test"],
+				acquisition_year=2024,
+				file_path=Path(f"ortho_{i}.tif"),
+			)
+			results.append(ValidationResult(filename=metadata.filename, is_valid=True, metadata=metadata, file_size=1))
+		
+		triggered = []
+		monkeypatch.setattr(workflow, "confirm_upload", lambda count, size: True)
+		monkeypatch.setattr(
+			workflow, "upload_file",
+			lambda metadata, **kwargs: UploadResult(filename=metadata.filename, success=True, dataset_id=int(metadata.filename[6])),
+		)
+		monkeypatch.setattr(
+			workflow, "trigger_processing",
+			lambda dataset_id, **kwargs: triggered.append(dataset_id) or True,
+		)
+		
+		upload_results = workflow.do_upload(results, token="token", api_url="http://test", dry_run=False)
+		
+		assert [r.dataset_id for r in upload_results] == [0, 1, 2]
+		assert sorted(triggered) == [0, 1, 2]
+	
+	def test_do_upload_reports_failed_processing_triggers(self, monkeypatch):
+		import io
+		from rich.console import Console
+		from deadtrees_upload import workflow
+		from deadtrees_upload.auth import AuthError
+		from deadtrees_upload.models import FileMetadata, LicenseEnum, PlatformEnum, UploadResult, ValidationResult
+		
+		metadata = FileMetadata(
+			filename="ortho.tif",
+			license=LicenseEnum.cc_by,
+			platform=PlatformEnum.drone,
+			authors=["Test"],
+			acquisition_year=2024,
+			file_path=Path("ortho.tif"),
+		)
+		results = [ValidationResult(filename="ortho.tif", is_valid=True, metadata=metadata, file_size=1)]
+		
+		def failing_trigger(dataset_id, **kwargs):
+			raise AuthError("session expired")
+		
+		output = io.StringIO()
+		monkeypatch.setattr(workflow, "console", Console(file=output, width=200))
+		monkeypatch.setattr(workflow, "confirm_upload", lambda count, size: True)
+		monkeypatch.setattr(
+			workflow, "upload_file",
+			lambda metadata, **kwargs: UploadResult(filename=metadata.filename, success=True, dataset_id=5),
+		)
+		monkeypatch.setattr(workflow, "trigger_processing", failing_trigger)
+		
+		upload_results = workflow.do_upload(results, token="token", api_url="http://test", dry_run=False)
+		
+		assert upload_results[0].success
+		assert "processing failed to start: session expired" in output.getvalue()
+	
+	def test_trigger_processing_returns_false_when_token_refresh_fails(self, monkeypatch, make_auth_session):
+		import httpx
+		from deadtrees_upload.auth import AuthError
+		from deadtrees_upload.models import UploadType
+		from deadtrees_upload.process import trigger_processing
+		
+		session = make_auth_session()
+		
+		def fail():
+			raise AuthError("refresh failed")
+		
+		monkeypatch.setattr(session, "get_auth_header", fail)
+		transport = httpx.MockTransport(lambda request: httpx.Response(200))
+		with httpx.Client(transport=transport) as client:
+			assert trigger_processing(1, UploadType.geotiff, session, "http://test", client=client) is False
+	
+	def test_do_upload_skips_completed_and_duplicate_files(self, monkeypatch):
+		from deadtrees_upload import workflow
+		from deadtrees_upload.dedup import UploadSessionState
+		from deadtrees_upload.models import FileMetadata, LicenseEnum, PlatformEnum, UploadResult, ValidationResult
+		
+		results = []
+		for name in ["a.tif", "b.tif", "c.tif", "d.tif"]:
+			metadata = FileMetadata(
+				filename=name,
+				license=LicenseEnum.cc_by,
+				platform=PlatformEnum.drone,
+				authors=["Test"],
+				acquisition_year=2024,
+				file_path=Path(name),
+			)
+			results.append(ValidationResult(filename=name, is_valid=True, metadata=metadata, file_size=1))
+		
+		session = UploadSessionState(
+			session_id="s", created_at="now", data_directory=".", metadata_file="", api_url="http://test",
+		)
+		session.files_completed.add("a.tif")
+		hashes = {"a.tif": "h1", "b.tif": "h1", "c.tif": "h2", "d.tif": "h2"}
+		
+		uploaded = []
+		monkeypatch.setattr(workflow, "calculate_hashes_with_progress", lambda *args: hashes)
+		monkeypatch.setattr(workflow, "confirm_upload", lambda count, size: True)
+		monkeypatch.setattr(workflow, "trigger_processing", lambda dataset_id, **kwargs: True)
+		monkeypatch.setattr(
+			workflow, "upload_file",
+			lambda metadata, **kwargs: uploaded.append(metadata.filename) or UploadResult(filename=metadata.filename, success=True, dataset_id=1),
+		)
+		
+		workflow.do_upload(results, token="token", api_url="http://test", dry_run=False, session=session)
+		
+		assert uploaded == ["b.tif", "c.tif"]
+		assert session.files_skipped == {"d.tif": "Duplicate of c.tif"}
+	
+	def test_do_upload_saves_session_when_interrupted(self, tmp_path, monkeypatch):
+		from deadtrees_upload import workflow
+		from deadtrees_upload.dedup import UploadSessionState, get_session_file_path
+		from deadtrees_upload.models import FileMetadata, LicenseEnum, PlatformEnum, UploadResult, ValidationResult
+		
+		results = []
+		for name in ["a.tif", "b.tif", "c.tif"]:
+			metadata = FileMetadata(
+				filename=name,
+				license=LicenseEnum.cc_by,
+				platform=PlatformEnum.drone,
+				authors=["Test"],
+				acquisition_year=2024,
+				file_path=tmp_path / name,
+			)
+			results.append(ValidationResult(filename=name, is_valid=True, metadata=metadata, file_size=1))
+		session = UploadSessionState(
+			session_id="s", created_at="now", data_directory=str(tmp_path), metadata_file="", api_url="http://test",
+		)
+		
+		def fake_upload(metadata, **kwargs):
+			if metadata.filename == "c.tif":
+				raise KeyboardInterrupt
+			return UploadResult(filename=metadata.filename, success=True, dataset_id=1)
+		
+		monkeypatch.setattr(workflow, "calculate_hashes_with_progress", lambda *args: {})
+		monkeypatch.setattr(workflow, "confirm_upload", lambda count, size: True)
+		monkeypatch.setattr(workflow, "trigger_processing", lambda dataset_id, **kwargs: True)
+		monkeypatch.setattr(workflow, "upload_file", fake_upload)
+		
+		with pytest.raises(KeyboardInterrupt):
+			workflow.do_upload(results, token="token", api_url="http://test", dry_run=False, session=session, data_dir=tmp_path)
+		
+		saved = UploadSessionState.load(get_session_file_path(tmp_path))
+		assert saved.files_completed == {"a.tif", "b.tif"}
+	
+	def test_do_upload_keeps_full_hashes_of_unique_uploads(self, tmp_path, monkeypatch):
+		from deadtrees_upload import workflow
+		from deadtrees_upload.dedup import (
+			UploadSessionState, get_file_identifier, get_hash_cache_key, get_hash_cache_path, load_hash_cache,
+		)
+		from deadtrees_upload.models import FileMetadata, LicenseEnum, PlatformEnum, UploadResult, ValidationResult
+		
+		results = []
+		for i, name in enumerate(["a.tif", "b.tif"]):
+			(tmp_path / name).write_bytes(bytes([i]) * 1000)
+			metadata = FileMetadata(
+				filename=name,
+				license=LicenseEnum.cc_by,
+				platform=PlatformEnum.drone,
+				authors=["Test"],
+				acquisition_year=2024,
+				file_path=tmp_path / name,
+			)
+			results.append(ValidationResult(filename=name, is_valid=True, metadata=metadata, file_size=1000))
+		session = UploadSessionState(
+			session_id="s", created_at="now", data_directory=str(tmp_path), metadata_file="", api_url="http://test",
+		)
+		
+		monkeypatch.setattr(workflow, "confirm_upload", lambda count, size: True)
+		monkeypatch.setattr(workflow, "trigger_processing", lambda dataset_id, **kwargs: True)
+		monkeypatch.setattr(
+			workflow, "upload_file",
+			lambda metadata, **kwargs: UploadResult(filename=metadata.filename, success=True, dataset_id=1),
+		)
+		
+		workflow.do_upload(results, token="token", api_url="http://test", dry_run=False, session=session, data_dir=tmp_path)
+		
+		# Both files are unique, so the hashing step skipped them; uploading records them
+		expected = {get_hash_cache_key(r.metadata.file_path): get_file_identifier(r.metadata.file_path) for r in results}
+		assert session.file_hashes == expected
+		assert load_hash_cache(get_hash_cache_path(tmp_path)) == expected
+	
+	def test_error_detail_caps_non_json_bodies(self):
+		import httpx
+		from deadtrees_upload.upload import _error_detail, MAX_ERROR_DETAIL_CHARS
+		
+		assert _error_detail(httpx.Response(400, json={"detail": "Bad license"})) == "Bad license"
+		assert len(_error_detail(httpx.Response(502, text="<html>" * 1000))) == MAX_ERROR_DETAIL_CHARS
 
 
 # Run with: pytest tests/test_all.py -v